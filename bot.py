@@ -2,12 +2,20 @@
 """Telegram бот для анализа постов из каналов с помощью LLM"""
 
 import asyncio
+import json
 import logging
+import socket
+import sys
+from functools import partial
+from typing import Optional
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
+from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.exceptions import TelegramNetworkError
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
 from config import (
     TELEGRAM_BOT_TOKEN,
@@ -16,6 +24,12 @@ from config import (
     CACHE_DIR,
     HEALTHCHECK_PORT,
     HEALTHCHECK_ENDPOINT,
+    FSM_BACKEND,
+    REDIS_URL,
+    REDIS_FSM_TTL,
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
 )
 from aiogram.types import BotCommand
 from handlers import channel_handler, start_handler
@@ -31,6 +45,36 @@ for d in (DATA_DIR, CACHE_DIR):
     d.mkdir(exist_ok=True)
 
 
+def create_storage() -> BaseStorage:
+    """Создание хранилища FSM согласно FSM_BACKEND"""
+    if FSM_BACKEND == "redis":
+        # Импорт внутри ветки: пакет redis нужен только для этого режима
+        from aiogram.fsm.storage.base import DefaultKeyBuilder
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        logger.info("FSM хранилище: Redis (%s)", REDIS_URL)
+        return RedisStorage.from_url(
+            REDIS_URL,
+            key_builder=DefaultKeyBuilder(with_bot_id=True),
+            # В данных FSM лежат посты с datetime — сериализуем их строкой
+            json_dumps=partial(json.dumps, default=str),
+            # TTL только у состояния: get_data не продлевает TTL данных, и настройки
+            # (промпт, модель) активного пользователя пропадали бы без записи в FSM
+            state_ttl=REDIS_FSM_TTL,
+        )
+    return MemoryStorage()
+
+
+def create_webhook_app(bot: Bot, dp: Dispatcher) -> web.Application:
+    """aiohttp приложение, принимающее обновления Telegram на WEBHOOK_PATH"""
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp, bot=bot, secret_token=WEBHOOK_SECRET or None
+    ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
 async def set_commands(bot: Bot):
     """Регистрация команд в меню Telegram"""
     commands = [
@@ -52,13 +96,17 @@ async def set_commands(bot: Bot):
             await asyncio.sleep(5)
 
 
-async def main():
-    """Запуск бота и healthcheck сервера"""
+async def main(healthcheck_sock: Optional[socket.socket] = None):
+    """Запуск бота и healthcheck сервера (опционально на заранее привязанном сокете)"""
+    # Python 3.12+: задачи, завершающиеся без ожидания I/O, выполняются сразу
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
     bot = Bot(
         token=TELEGRAM_BOT_TOKEN,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-    dp = Dispatcher(storage=MemoryStorage())
+    dp = Dispatcher(storage=create_storage())
     dp.include_router(start_handler.router)
     dp.include_router(channel_handler.router)
 
@@ -66,13 +114,42 @@ async def main():
 
     try:
         await set_commands(bot)
+
+        if WEBHOOK_URL:
+            # Webhook: обновления принимает тот же aiohttp сервер, что и healthcheck
+            app = create_webhook_app(bot, dp)
+            healthcheck_runner = await start_healthcheck_server(
+                port=HEALTHCHECK_PORT,
+                endpoint=HEALTHCHECK_ENDPOINT,
+                app=app,
+                sock=healthcheck_sock,
+            )
+            for attempt in range(1, 6):
+                try:
+                    await bot.set_webhook(
+                        WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+                        secret_token=WEBHOOK_SECRET or None,
+                    )
+                    break
+                except TelegramNetworkError:
+                    if attempt == 5:
+                        logger.error("Не удалось установить webhook после 5 попыток")
+                        raise
+                    logger.warning("Ошибка установки webhook, повтор через 10 сек...")
+                    await asyncio.sleep(10)
+            logger.info("Webhook установлен: %s%s", WEBHOOK_URL.rstrip("/"), WEBHOOK_PATH)
+            await asyncio.Event().wait()
+            return
+
         healthcheck_runner = await start_healthcheck_server(
-            port=HEALTHCHECK_PORT, endpoint=HEALTHCHECK_ENDPOINT
+            port=HEALTHCHECK_PORT, endpoint=HEALTHCHECK_ENDPOINT, sock=healthcheck_sock
         )
 
         for attempt in range(1, 6):
             try:
                 logger.info("Подключение к Telegram (попытка %d/5)...", attempt)
+                # Снимаем webhook, если бот раньше работал в этом режиме
+                await bot.delete_webhook()
                 await dp.start_polling(bot)
                 break
             except TelegramNetworkError:
@@ -84,11 +161,20 @@ async def main():
     finally:
         if healthcheck_runner is not None:
             await healthcheck_runner.cleanup()
+        await channel_handler.close_session()
         await bot.session.close()
 
 
 if __name__ == "__main__":
+    run = asyncio.run
+    if sys.platform != "win32":
+        try:
+            # uvloop: более быстрый event loop на libuv (нет под Windows)
+            from uvloop import run
+        except ImportError:
+            pass
+
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
         logger.info("Бот остановлен")
@@ -15,6 +15,11 @@ CACHE_DIR = DATA_DIR / "cache"
 # Telegram Bot (из .env)
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 
+# Webhook вместо polling: публичный HTTPS-адрес бота (пусто — polling)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = "/webhook"
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+
 # Ollama Cloud + LangChain
 OLLAMA_API_KEY = os.getenv("OLLAMA_API_KEY", "")  # из .env
 OLLAMA_BASE_URL = "https://ollama.com"
@@ -32,14 +37,23 @@ LLM_TIMEOUT = 120  # секунды
 # Парсер настройки
 MAX_PAGES_PER_REQUEST = 3
 INCLUDE_FORWARDED_POSTS = True
+CHANNEL_CACHE_TTL = 60  # секунды, повторный скан канала берётся из кэша
 
 # Telegram лимиты
 MAX_MESSAGE_LENGTH = 4096
 MAX_CAPTION_LENGTH = 1024  # подпись для фото/видео
+MAX_VIDEO_SIZE = 50 * 1024 * 1024  # загрузка видео ботом, байты
 MAX_POSTS_IN_SUMMARY = 20
 
 # Рерайтинг постов
 DEFAULT_REWRITE_PROMPT = "Перепиши пост простыми словами. Выдавай только текст рерайта, без форматирования Markdown, без заголовков и без лишних символов, но с разбивкой на абзацы."
+REWRITE_CACHE_SIZE = 256  # сколько рерайтов держать в памяти
+REWRITE_CACHE_TTL = 600  # секунды
+
+# Хранилище FSM: "memory" (по умолчанию) или "redis" для нескольких процессов
+FSM_BACKEND = os.getenv("FSM_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_FSM_TTL = 7 * 24 * 3600  # секунды, через которые незавершённое состояние FSM сбрасывается
 
 # Логирование
 LOG_LEVEL = "INFO"
@@ -1,23 +1,151 @@
 "Обработчик команд и сообщений с каналами"
 
 from aiogram import Router, F
-from aiogram.types import Message, BufferedInputFile
+from aiogram.types import Message, InputFile
 from aiogram.fsm.context import FSMContext
+from aiogram.exceptions import TelegramBadRequest, TelegramNetworkError
+import asyncio
+import hashlib
 import logging
-from typing import Callable, Any, Optional
+import re
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from typing import AsyncGenerator, Callable, Any, Optional
 
 import aiohttp
 
-from utils.parser import TelegramWebScraper, TelegramWebError, parse_post_link, is_valid_channel_username
-from utils.llm_service import rewrite_post
+from utils.parser import (
+    TelegramWebScraper,
+    TelegramWebError,
+    parse_post_link,
+    is_valid_channel_username,
+    normalize_channel_link,
+)
+from utils.llm_service import REWRITE_ERROR_PREFIX, rewrite_post
 from utils.formatter import format_summary
 from utils.text_utils import split_text, split_text_once
-from config import MAX_PAGES_PER_REQUEST, MAX_MESSAGE_LENGTH, MAX_CAPTION_LENGTH
+from config import (
+    MAX_PAGES_PER_REQUEST,
+    CHANNEL_CACHE_TTL,
+    MAX_MESSAGE_LENGTH,
+    MAX_CAPTION_LENGTH,
+    MAX_VIDEO_SIZE,
+    OLLAMA_MODEL,
+    DEFAULT_REWRITE_PROMPT,
+    REWRITE_CACHE_SIZE,
+    REWRITE_CACHE_TTL,
+)
 from utils.states import PostSelectionState
 
 router = Router()
 logger = logging.getLogger(__name__)
 
+# Признаки ссылки на Telegram во входящем тексте
+_LINK_HINT = re.compile(r"t\.me|@|http", re.IGNORECASE).search
+
+# Типовые формы ввода: t.me-ссылка на канал/пост или имя канала (с @ или без)
+_INPUT_SHAPE = re.compile(
+    r"^(?:https?://)?t\.me/(?:s/)?(?P<slug>[A-Za-z0-9_]+)(?:/(?P<post_id>\d+))?/?$"
+    r"|^@?(?P<handle>[A-Za-z][A-Za-z0-9_]{4,31})$"
+)
+
+# Ожидаемые ошибки отправки медиа: после них пробуем следующий вариант
+_SEND_ERRORS = (TelegramBadRequest, TelegramNetworkError)
+_DOWNLOAD_ERRORS = _SEND_ERRORS + (aiohttp.ClientError, asyncio.TimeoutError)
+
+# Параметры скачивания медиа с CDN Telegram
+_DOWNLOAD_HEADERS = MappingProxyType({
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"
+})
+_VIDEO_TIMEOUT = aiohttp.ClientTimeout(total=60)
+_PHOTO_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+# Общая HTTP-сессия для скачивания медиа с CDN Telegram (keep-alive между запросами)
+_session: Optional[aiohttp.ClientSession] = None
+
+# (хост, тип медиа), которые Telegram не смог сам забрать по ссылке -> момент истечения
+_link_fetch_failures: dict[tuple[str, str], float] = {}
+# Через сколько секунд снова пробуем отправку ссылкой (ошибка могла быть из-за одного файла)
+_LINK_FAILURE_TTL = 600
+# Фрагменты ответа Bot API, означающие, что Telegram не смог скачать файл по URL
+_LINK_FETCH_ERROR_MARKERS = ("http url", "web page content")
+
+# Общий парсер: переиспользует keep-alive соединения с t.me между запросами
+_scraper: Optional[TelegramWebScraper] = None
+
+# Кэш рерайтов: ключ -> (текст рерайта, момент истечения по time.monotonic())
+_rewrite_cache: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+
+# Кэш сканирования каналов: ссылка -> (момент истечения, посты, сводка)
+_channel_cache: dict[str, tuple[float, list[dict], str]] = {}
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Возвращает общую aiohttp-сессию, создавая её при первом обращении"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=8,
+                ssl=False,  # CDN Telegram использует self-signed сертификат
+                keepalive_timeout=75,
+                ttl_dns_cache=300,  # хосты CDN стабильны, не резолвим их каждые 10 сек
+            ),
+            timeout=_VIDEO_TIMEOUT,
+            headers=dict(_DOWNLOAD_HEADERS),
+        )
+    return _session
+
+
+class ResponseInputFile(InputFile):
+    """Файл для загрузки в Telegram, читаемый потоком из открытого HTTP-ответа"""
+
+    def __init__(self, response: aiohttp.ClientResponse, filename: str):
+        super().__init__(filename=filename)
+        self.response = response
+
+    async def read(self, bot) -> AsyncGenerator[bytes, None]:
+        async for chunk in self.response.content.iter_chunked(self.chunk_size):
+            yield chunk
+
+
+def get_scraper() -> TelegramWebScraper:
+    """Возвращает общий экземпляр парсера, создавая его при первом обращении"""
+    global _scraper
+    if _scraper is None:
+        _scraper = TelegramWebScraper()
+    return _scraper
+
+
+async def close_session() -> None:
+    """Закрывает общие aiohttp-сессии бота и парсера (вызывается при остановке бота)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    if _scraper is not None:
+        await _scraper.close()
+
+
+async def get_channel_posts(channel: str) -> tuple[list[dict], str]:
+    """Посты канала и их сводка; повторный запрос в течение TTL берётся из кэша"""
+    key = normalize_channel_link(channel)
+    now = time.monotonic()
+    cached = _channel_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1], cached[2]
+
+    posts = await get_scraper().fetch_posts(channel, pages=MAX_PAGES_PER_REQUEST)
+    summary = format_summary(posts)
+    # Попутно убираем устаревшие записи, чтобы кэш не рос без ограничений
+    for stale in [k for k, v in _channel_cache.items() if v[0] <= now]:
+        del _channel_cache[stale]
+    _channel_cache[key] = (now + CHANNEL_CACHE_TTL, posts, summary)
+    return posts, summary
+
 
 async def with_status_message(
     message: Message, status_text: str, action: Callable, *args, **kwargs
@@ -33,111 +161,151 @@ async def with_status_message(
         raise
 
 
+def _rewrite_cache_key(post: dict, custom_prompt: Optional[str], model: Optional[str]) -> str:
+    """Ключ кэша рерайта по модели, промпту и содержимому поста"""
+    raw = "|".join((
+        model or OLLAMA_MODEL,
+        custom_prompt or DEFAULT_REWRITE_PROMPT,
+        str(post.get("post_link")),
+        post.get("text") or "",
+    ))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+async def get_rewrite(
+    post: dict, custom_prompt: Optional[str], model: Optional[str]
+) -> str:
+    """Рерайт поста с кэшированием повторных запросов того же поста"""
+    key = _rewrite_cache_key(post, custom_prompt, model)
+    cached = _rewrite_cache.get(key)
+    if cached and cached[1] > time.monotonic():
+        _rewrite_cache.move_to_end(key)
+        return cached[0]
+
+    rewritten = await rewrite_post(post, custom_prompt, model)
+    # Ошибки LLM не кэшируем, чтобы повторная попытка снова обратилась к модели
+    if not rewritten.startswith(REWRITE_ERROR_PREFIX):
+        _rewrite_cache[key] = (rewritten, time.monotonic() + REWRITE_CACHE_TTL)
+        _rewrite_cache.move_to_end(key)
+        while len(_rewrite_cache) > REWRITE_CACHE_SIZE:
+            _rewrite_cache.popitem(last=False)
+    return rewritten
+
+
+async def _send_video_by_file_id(message: Message, file_id: str, caption: str) -> bool:
+    """Отправка видео по file_id (из пересланных сообщений)"""
+    try:
+        await message.answer_video(video=file_id, caption=caption, parse_mode=None)
+        return True
+    except _SEND_ERRORS as e:
+        logger.error("Failed to send video by file_id: %s", e)
+        return False
+
+
+async def _send_by_link(send: Callable, field: str, url: str, caption: str) -> bool:
+    """Отправка медиа ссылкой: Telegram сам скачивает файл, без загрузки через бота"""
+    key = (urlsplit(url).hostname or "", field)
+    if _link_fetch_failures.get(key, 0) > time.monotonic():
+        return False
+    try:
+        await send(**{field: url}, caption=caption, parse_mode=None)
+        return True
+    except _SEND_ERRORS as e:
+        # Запоминаем только отказ скачать URL, чтобы не тратить лишний запрос на каждый пост
+        if isinstance(e, TelegramBadRequest) and any(
+            marker in e.message.lower() for marker in _LINK_FETCH_ERROR_MARKERS
+        ):
+            _link_fetch_failures[key] = time.monotonic() + _LINK_FAILURE_TTL
+        logger.info("Telegram can't send %s from %s by URL: %s", field, key[0], e)
+        return False
+
+
+async def _send_video_by_url(message: Message, url: str, caption: str) -> bool:
+    """Отправка видео по URL: ссылкой, иначе скачивание с CDN и отправка потоком"""
+    if await _send_by_link(message.answer_video, "video", url, caption):
+        return True
+    try:
+        session = await get_session()
+        async with session.get(url, timeout=_VIDEO_TIMEOUT) as resp:
+            if resp.status != 200:
+                logger.warning("Failed to download video: HTTP %s", resp.status)
+                return False
+            # Проверка размера до чтения тела (лимит Telegram: 50 МБ)
+            content_length = resp.headers.get("Content-Length")
+            if (
+                content_length is not None
+                and content_length.isdigit()
+                and int(content_length) > MAX_VIDEO_SIZE
+            ):
+                logger.warning("Video too large: %s bytes", content_length)
+                return False
+            video_file = ResponseInputFile(resp, filename="video.mp4")
+            await message.answer_video(video=video_file, caption=caption, parse_mode=None)
+            return True
+    except _DOWNLOAD_ERRORS as e:
+        logger.error("Failed to download/send video: %s", e)
+        return False
+
+
+async def _send_photo_by_file_id(message: Message, file_id: str, caption: str) -> bool:
+    """Отправка фото по file_id (из пересланных сообщений)"""
+    try:
+        await message.answer_photo(photo=file_id, caption=caption, parse_mode=None)
+        return True
+    except _SEND_ERRORS as e:
+        logger.error("Failed to send photo by file_id: %s", e)
+        return False
+
+
+async def _send_photo_by_url(message: Message, url: str, caption: str) -> bool:
+    """Отправка фото по URL: ссылкой, иначе скачивание с CDN и отправка потоком"""
+    if await _send_by_link(message.answer_photo, "photo", url, caption):
+        return True
+    try:
+        # Telegram не всегда может загрузить с CDN напрямую — передаём фото потоком
+        session = await get_session()
+        async with session.get(url, timeout=_PHOTO_TIMEOUT) as resp:
+            if resp.status != 200:
+                logger.warning("Failed to download photo: HTTP %s", resp.status)
+                return False
+            photo_file = ResponseInputFile(resp, filename="photo.jpg")
+            await message.answer_photo(photo=photo_file, caption=caption, parse_mode=None)
+            return True
+    except _DOWNLOAD_ERRORS as e:
+        logger.error("Failed to download/send photo: %s", e)
+        return False
+
+
 async def send_rewritten_post(
     message: Message, post: dict, custom_prompt: Optional[str], model: Optional[str]
 ):
     """Общая функция для рерайта и отправки поста (с видео, фото или без)"""
-    rewritten = await rewrite_post(post, custom_prompt, model)
-    photo_url = post.get("photo_url")
-    photo_file_id = post.get("photo_file_id")
-    video_url = post.get("video_url")
-    video_file_id = post.get("video_file_id")
+    rewritten = await get_rewrite(post, custom_prompt, model)
 
-    has_media = bool(video_file_id or video_url or photo_file_id or photo_url)
-    caption, remainder = split_text_once(rewritten, MAX_CAPTION_LENGTH)
-    extra_text_chunks = split_text(remainder, MAX_MESSAGE_LENGTH) if remainder else []
-    text_chunks = split_text(rewritten, MAX_MESSAGE_LENGTH)
+    if len(rewritten) <= MAX_CAPTION_LENGTH:
+        caption, remainder = rewritten.strip(), ""
+    else:
+        caption, remainder = split_text_once(rewritten, MAX_CAPTION_LENGTH)
 
     async def send_text_chunks(chunks: list[str]) -> None:
         for chunk in chunks:
             await message.answer(chunk, parse_mode=None)
 
-    # Попытка отправить видео через file_id (из пересланных сообщений)
-    if video_file_id:
-        try:
-            await message.answer_video(
-                video=video_file_id, caption=caption, parse_mode=None
-            )
-            if extra_text_chunks:
-                await send_text_chunks(extra_text_chunks)
-            return
-        except Exception as e:
-            logger.error("Failed to send video by file_id: %s", e)
-
-    # Попытка скачать и отправить видео по URL
-    if video_url:
-        try:
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"
-                }
-                async with session.get(
-                    video_url,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=60),
-                    ssl=False,  # CDN Telegram использует self-signed сертификат
-                ) as resp:
-                    if resp.status == 200:
-                        # Проверка размера (лимит Telegram: 50 МБ)
-                        content_length = resp.headers.get('Content-Length')
-                        if content_length and int(content_length) > 50 * 1024 * 1024:
-                            logger.warning("Video too large: %s bytes", content_length)
-                        else:
-                            video_bytes = await resp.read()
-                            video_file = BufferedInputFile(video_bytes, filename="video.mp4")
-                            await message.answer_video(
-                                video=video_file, caption=caption, parse_mode=None
-                            )
-                            if extra_text_chunks:
-                                await send_text_chunks(extra_text_chunks)
-                            return
-                    else:
-                        logger.warning("Failed to download video: HTTP %s", resp.status)
-        except Exception as e:
-            logger.error("Failed to download/send video: %s", e)
-
-    if photo_file_id:
-        try:
-            await message.answer_photo(
-                photo=photo_file_id, caption=caption, parse_mode=None
-            )
-            if extra_text_chunks:
-                await send_text_chunks(extra_text_chunks)
+    # Медиа пробуем по приоритету: видео, затем фото; file_id раньше URL
+    media_senders = (
+        (post.get("video_file_id"), _send_video_by_file_id),
+        (post.get("video_url"), _send_video_by_url),
+        (post.get("photo_file_id"), _send_photo_by_file_id),
+        (post.get("photo_url"), _send_photo_by_url),
+    )
+    for media, sender in media_senders:
+        if media and await sender(message, media, caption):
+            if remainder:
+                await send_text_chunks(split_text(remainder, MAX_MESSAGE_LENGTH))
             return
-        except Exception as e:
-            logger.error("Failed to send photo by file_id: %s", e)
-
-    if photo_url:
-        try:
-            # Загружаем фото в память, т.к. Telegram не может загрузить с CDN напрямую
-            async with aiohttp.ClientSession() as session:
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"
-                }
-                async with session.get(
-                    photo_url,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30),
-                    ssl=False,  # CDN Telegram использует self-signed сертификат
-                ) as resp:
-                    if resp.status == 200:
-                        photo_bytes = await resp.read()
-                        photo_file = BufferedInputFile(photo_bytes, filename="photo.jpg")
-                        await message.answer_photo(
-                            photo=photo_file, caption=caption, parse_mode=None
-                        )
-                        if extra_text_chunks:
-                            await send_text_chunks(extra_text_chunks)
-                        return
-                    else:
-                        logger.warning("Failed to download photo: HTTP %s", resp.status)
-        except Exception as e:
-            logger.error("Failed to download/send photo: %s", e)
 
     # Fallback: отправить только текст
-    if not has_media and not text_chunks:
-        return
-    await send_text_chunks(text_chunks)
+    await send_text_chunks(split_text(rewritten, MAX_MESSAGE_LENGTH))
 
 
 @router.message(PostSelectionState.waiting_for_selection)
@@ -147,7 +315,7 @@ async def handle_post_selection(message: Message, state: FSMContext):
     if not text:
         return
     if not text.isdigit():
-        if any(x in text.lower() for x in ["t.me", "@", "http"]) or is_valid_channel_username(text):
+        if _LINK_HINT(text) or is_valid_channel_username(text):
             return await handle_channel_link(message, state)
         return await message.answer(
             "❌ Отправь номер поста цифрой или пришли ссылку на канал заново."
@@ -202,8 +370,7 @@ async def handle_direct_post_link(
     selected_model = data.get("selected_model")
 
     async def fetch_and_rewrite():
-        scraper = TelegramWebScraper()
-        post = scraper.fetch_single_post(channel_slug, post_id)
+        post = await get_scraper().fetch_single_post(channel_slug, post_id)
         await send_rewritten_post(message, post, custom_prompt, selected_model)
 
     try:
@@ -232,10 +399,10 @@ async def handle_channel_scan(message: Message, state: FSMContext, channel: str)
         channel: Ссылка на канал (в любом формате)
     """
     async def parse_action():
-        posts = TelegramWebScraper().fetch_posts(channel, pages=MAX_PAGES_PER_REQUEST)
+        posts, summary = await get_channel_posts(channel)
         await state.update_data(posts=posts)
         await state.set_state(PostSelectionState.waiting_for_selection)
-        await message.answer(format_summary(posts))
+        await message.answer(summary)
 
     try:
         await with_status_message(message, "⏳ Парсинг канала...", parse_action)
@@ -305,8 +472,16 @@ async def handle_channel_link(message: Message, state: FSMContext):
         return
     channel = message.text.strip()
 
+    # Быстрый путь: типовая ссылка или имя канала распознаются одной регуляркой
+    if shape := _INPUT_SHAPE.match(channel):
+        slug = shape["slug"] or shape["handle"]
+        post_id = int(shape["post_id"] or 0)
+        if post_id:
+            return await handle_direct_post_link(message, state, (slug, post_id))
+        return await handle_channel_scan(message, state, f"@{slug}")
+
     # Валидация входа: проверяем что это похоже на ссылку на Telegram
-    if not any(x in channel.lower() for x in ["t.me", "@", "http"]):
+    if not _LINK_HINT(channel):
         if "/" not in channel and len(channel) > 3:
             # Проверяем формат имени канала (только латиница, цифры, подчеркивание, 5-32 символа)
             if not is_valid_channel_username(channel):
@@ -10,8 +10,10 @@ from aiogram.types import (
     FSInputFile,
 )
 from aiogram.fsm.context import FSMContext
+import asyncio
 import logging
 from pathlib import Path
+from typing import Optional
 
 from config import (
     DEFAULT_REWRITE_PROMPT,
@@ -23,6 +25,11 @@ router = Router()
 logger = logging.getLogger(__name__)
 
 INSTRUCTION_IMAGE_PATH = Path(__file__).resolve().parents[1] / "images" / "instruction.png"
+INSTRUCTION_IMAGE = (
+    FSInputFile(str(INSTRUCTION_IMAGE_PATH)) if INSTRUCTION_IMAGE_PATH.exists() else None
+)
+# file_id картинки после первой загрузки: дальше Telegram отдаёт её без повторной загрузки
+_instruction_file_id: Optional[str] = None
 
 HELP_TEXT = {
     "start": (
@@ -52,6 +59,23 @@ HELP_TEXT = {
     ),
 }
 
+SETTINGS_TEMPLATE = (
+    "⚙️ <b>Ваши настройки:</b>\n\n"
+    "🤖 <b>Модель:</b> <code>{model}</code>\n"
+    "📝 <b>Промпт:</b> <i>{prompt}</i>\n\n"
+    "Для изменения:\n"
+    "• /prompt &lt;текст&gt;\n"
+    "• /model"
+)
+
+
+# Клавиатура выбора модели не зависит от пользователя — собираем один раз
+MODEL_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text=model, callback_data=f"model:{model}")]
+    for model in AVAILABLE_MODELS
+])
+AVAILABLE_MODELS_SET = frozenset(AVAILABLE_MODELS)
+
 
 @router.message(Command("start"))
 async def cmd_start(message: Message, state: FSMContext):
@@ -63,14 +87,19 @@ async def cmd_start(message: Message, state: FSMContext):
 @router.message(Command("help"))
 async def cmd_help(message: Message):
     """Обработчик команды /help"""
-    if not INSTRUCTION_IMAGE_PATH.exists():
+    global _instruction_file_id
+    if _instruction_file_id:
+        return await message.answer_photo(
+            photo=_instruction_file_id, caption=HELP_TEXT["help"]
+        )
+
+    if INSTRUCTION_IMAGE is None:
         logger.warning("Instruction image not found: %s", INSTRUCTION_IMAGE_PATH)
         return await message.answer(HELP_TEXT["help"])
 
-    await message.answer_photo(
-        photo=FSInputFile(str(INSTRUCTION_IMAGE_PATH)),
-        caption=HELP_TEXT["help"],
-    )
+    sent = await message.answer_photo(photo=INSTRUCTION_IMAGE, caption=HELP_TEXT["help"])
+    if sent.photo:
+        _instruction_file_id = sent.photo[-1].file_id
 
 
 @router.message(Command("settings"))
@@ -80,32 +109,15 @@ async def cmd_settings(message: Message, state: FSMContext):
     custom_prompt = data.get("rewrite_prompt", DEFAULT_REWRITE_PROMPT)
     selected_model = data.get("selected_model", OLLAMA_MODEL)
 
-    text = (
-        "⚙️ <b>Ваши настройки:</b>\n\n"
-        f"🤖 <b>Модель:</b> <code>{selected_model}</code>\n"
-        f"📝 <b>Промпт:</b> <i>{custom_prompt}</i>\n\n"
-        "Для изменения:\n"
-        "• /prompt &lt;текст&gt;\n"
-        "• /model"
+    await message.answer(
+        SETTINGS_TEMPLATE.format(model=selected_model, prompt=custom_prompt)
     )
-    await message.answer(text)
 
 
 @router.message(Command("model"))
 async def cmd_model(message: Message, state: FSMContext):
     """Выбор модели LLM через inline-клавиатуру"""
-    data = await state.get_data()
-    current_model = data.get("selected_model", OLLAMA_MODEL)
-
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(
-            text=f"{'' if model == current_model else ''}{model}",
-            callback_data=f"model:{model}"
-        )]
-        for model in AVAILABLE_MODELS
-    ])
-
-    await message.answer("🤖 <b>Выберите модель:</b>", reply_markup=keyboard)
+    await message.answer("🤖 <b>Выберите модель:</b>", reply_markup=MODEL_KEYBOARD)
 
 
 @router.callback_query(F.data.startswith("model:"))
@@ -113,11 +125,18 @@ async def callback_select_model(callback: CallbackQuery, state: FSMContext):
     """Обработка выбора модели через inline-кнопку"""
     model = callback.data.split(":", 1)[1]
 
-    if model not in AVAILABLE_MODELS:
+    if model not in AVAILABLE_MODELS_SET:
         return await callback.answer("❌ Недопустимая модель", show_alert=True)
 
-    await state.update_data(selected_model=model)
-    await callback.message.edit_text(f"✅ Модель установлена: <code>{model}</code>")
+    data = await state.get_data()
+    if data.get("selected_model", OLLAMA_MODEL) == model:
+        # Модель не изменилась — ни FSM, ни сообщение трогать не нужно
+        return await callback.answer("✅ Уже выбрано", show_alert=False)
+
+    await asyncio.gather(
+        state.update_data(selected_model=model),
+        callback.message.edit_text(f"✅ Модель установлена: <code>{model}</code>"),
+    )
     await callback.answer()
 
 
@@ -1,9 +1,14 @@
 """Pytest конфигурация и фикстуры для тестирования бота"""
 
+from types import SimpleNamespace
+
 import pytest
+import pytest_asyncio
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import MagicMock
+
+from tests.stubs import Recorder, make_message
 
 
 @pytest.fixture
@@ -24,36 +29,34 @@ def dp():
 @pytest.fixture
 def mock_message():
     """Мок Message для тестирования handlers"""
-    message = AsyncMock()
-    message.from_user.id = 123456
-    message.from_user.first_name = "TestUser"
-    message.text = "/start"
-    message.answer = AsyncMock()
-    message.reply = AsyncMock()
-    return message
+    return make_message()
 
 
 @pytest.fixture
 def mock_state():
     """Мок FSMContext для тестирования состояний"""
-    state = AsyncMock()
-    state.set_state = AsyncMock()
-    state.get_data = AsyncMock(return_value={})
-    state.update_data = AsyncMock()
-    return state
+    return SimpleNamespace(
+        set_state=Recorder(),
+        get_data=Recorder({}),
+        update_data=Recorder(),
+        clear=Recorder(),
+    )
 
 
-@pytest.fixture
-def aiohttp_client():
-    """Фикстура для создания тестового aiohttp клиента"""
+@pytest_asyncio.fixture
+async def aiohttp_client():
+    """Фабрика тестовых aiohttp клиентов; все клиенты закрываются после теста"""
     from aiohttp.test_utils import TestClient, TestServer
 
-    async def factory(app):
-        server = TestServer(app)
-        client = TestClient(server)
+    clients = []
 
+    async def factory(app):
+        client = TestClient(TestServer(app))
         await client.start_server()
-        yield client
-        await client.close()
+        clients.append(client)
+        return client
 
-    return factory
+    yield factory
+
+    for client in clients:
+        await client.close()
@@ -0,0 +1,89 @@
+"""Лёгкие заглушки aiogram-объектов для тестов handlers"""
+
+from types import SimpleNamespace
+
+
+class Recorder:
+    """
+    Лёгкая замена AsyncMock: запоминает аргументы вызовов и возвращает return_value.
+
+    side_effect как у AsyncMock: исключение выбрасывается, последовательность
+    отдаёт по элементу на вызов (исключения из неё тоже выбрасываются).
+    """
+
+    def __init__(self, return_value=None, side_effect=None):
+        self.return_value = return_value
+        self.side_effect = side_effect
+        self.call_args_list = []
+
+    @property
+    def side_effect(self):
+        return self._side_effect
+
+    @side_effect.setter
+    def side_effect(self, value):
+        if value is not None and not isinstance(value, BaseException):
+            value = iter(value)
+        self._side_effect = value
+
+    async def __call__(self, *args, **kwargs):
+        self.call_args_list.append((args, kwargs))
+        effect = self._side_effect
+        if effect is None:
+            return self.return_value
+        if not isinstance(effect, BaseException):
+            effect = next(effect)
+        if isinstance(effect, BaseException):
+            raise effect
+        return effect
+
+    @property
+    def call_args(self):
+        return self.call_args_list[-1] if self.call_args_list else None
+
+    @property
+    def call_count(self):
+        return len(self.call_args_list)
+
+    def assert_called_once(self):
+        assert self.call_count == 1, f"Expected 1 call, got {self.call_count}"
+
+    def assert_called_once_with(self, *args, **kwargs):
+        self.assert_called_once()
+        assert self.call_args == (args, kwargs), f"{self.call_args} != {(args, kwargs)}"
+
+    def assert_not_called(self):
+        assert not self.call_args_list, f"Expected no calls, got {self.call_count}"
+
+
+def sent_message(*file_ids):
+    """Ответ бота: статус-сообщения удаляются/редактируются, у фото есть file_id"""
+    return SimpleNamespace(
+        delete=Recorder(),
+        edit_text=Recorder(),
+        photo=[SimpleNamespace(file_id=file_id) for file_id in file_ids or ("FILE_ID",)],
+    )
+
+
+def make_message():
+    """Входящее сообщение пользователя с записывающими методами ответа"""
+    return SimpleNamespace(
+        from_user=SimpleNamespace(id=123456, first_name="TestUser"),
+        text="/start",
+        caption=None,
+        photo=None,
+        video=None,
+        answer=Recorder(sent_message()),
+        reply=Recorder(sent_message()),
+        answer_photo=Recorder(sent_message()),
+        answer_video=Recorder(sent_message()),
+    )
+
+
+def make_callback(data: str):
+    """CallbackQuery: data, answer() и сообщение с клавиатурой"""
+    return SimpleNamespace(
+        data=data,
+        answer=Recorder(),
+        message=SimpleNamespace(edit_text=Recorder()),
+    )
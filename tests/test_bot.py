@@ -8,10 +8,22 @@ import aiohttp
 import pytest
 
 
-def _get_free_port() -> int:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        sock.bind(("", 0))
-        return sock.getsockname()[1]
+@pytest.fixture(scope="module")
+def event_loop_policy():
+    """Запуск бота на uvloop, как в продакшене (если uvloop доступен)"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+def _bind_free_socket() -> socket.socket:
+    """Сокет на свободном порту; остаётся открытым, чтобы порт не заняли до старта бота"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    return sock
 
 
 async def _wait_for_healthcheck(
@@ -19,8 +31,13 @@ async def _wait_for_healthcheck(
 ) -> None:
     loop = asyncio.get_running_loop()
     deadline = loop.time() + timeout
+    delay = 0.05
+
+    # Одно keep-alive соединение на все опросы вместо нового на каждый
+    connector = aiohttp.TCPConnector(limit=1, force_close=False, keepalive_timeout=30)
+    request_timeout = aiohttp.ClientTimeout(total=0.5)
 
-    async with aiohttp.ClientSession() as session:
+    async with aiohttp.ClientSession(connector=connector) as session:
         while loop.time() < deadline:
             if task.done():
                 exc = task.exception()
@@ -31,22 +48,24 @@ async def _wait_for_healthcheck(
                 raise AssertionError("bot stopped before healthcheck became ready")
 
             try:
-                async with session.get(url) as resp:
+                async with session.get(url, timeout=request_timeout) as resp:
                     if resp.status == 200:
                         text = await resp.text()
                         if text.strip() == "OK":
                             return
-            except aiohttp.ClientError:
+            except (aiohttp.ClientError, asyncio.TimeoutError):
                 pass
 
-            await asyncio.sleep(0.2)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
 
     raise AssertionError(f"healthcheck did not start within {timeout}s: {url}")
 
 
 @pytest.mark.asyncio
 async def test_real_bot_startup(monkeypatch):
-    port = _get_free_port()
+    sock = _bind_free_socket()
+    port = sock.getsockname()[1]
     endpoint = "/health"
 
     import bot as bot_module
@@ -56,7 +75,7 @@ async def test_real_bot_startup(monkeypatch):
     monkeypatch.setattr(bot_module, "HEALTHCHECK_PORT", port)
     monkeypatch.setattr(bot_module, "HEALTHCHECK_ENDPOINT", endpoint)
 
-    task = asyncio.create_task(bot_module.main())
+    task = asyncio.create_task(bot_module.main(healthcheck_sock=sock))
     try:
         await _wait_for_healthcheck(task, f"http://127.0.0.1:{port}{endpoint}")
         assert not task.done(), "bot exited early after startup"
@@ -64,3 +83,4 @@ async def test_real_bot_startup(monkeypatch):
         task.cancel()
         with suppress(asyncio.CancelledError):
             await task
+        sock.close()
@@ -1,7 +1,10 @@
 """Тесты для обработчиков команд и сообщений"""
 
+from types import SimpleNamespace
+
+import aiohttp
 import pytest
-from unittest.mock import AsyncMock
+from aiogram.exceptions import TelegramBadRequest, TelegramNetworkError
 from handlers.start_handler import (
     cmd_start,
     cmd_help,
@@ -10,6 +13,7 @@ from handlers.start_handler import (
     cmd_model,
 )
 from config import OLLAMA_MODEL, AVAILABLE_MODELS
+from tests.stubs import Recorder, make_callback, make_message, sent_message
 
 
 @pytest.mark.asyncio
@@ -166,8 +170,7 @@ async def test_cmd_prompt_too_short(mock_message, mock_state):
 @pytest.mark.asyncio
 async def test_cmd_start_contains_emoji(mock_state):
     """Тест что /start содержит эмодзи"""
-    mock_message = AsyncMock()
-    mock_message.answer = AsyncMock()
+    mock_message = make_message()
     mock_state.get_data.return_value = {}
 
     await cmd_start(mock_message, mock_state)
@@ -182,8 +185,7 @@ async def test_cmd_start_contains_emoji(mock_state):
 @pytest.mark.asyncio
 async def test_cmd_help_contains_emoji():
     """Тест что /help содержит эмодзи"""
-    mock_message = AsyncMock()
-    mock_message.answer = AsyncMock()
+    mock_message = make_message()
 
     await cmd_help(mock_message)
 
@@ -214,3 +216,237 @@ async def test_cmd_start_formats_as_html(mock_message, mock_state):
     # Проверяем наличие HTML тегов (эмодзи используются как текст)
     assert isinstance(call_args, str)
     assert len(call_args) > 0
+
+
+@pytest.mark.asyncio
+async def test_get_rewrite_caches_repeat_requests(monkeypatch):
+    """Тест что повторный рерайт того же поста берётся из кэша"""
+    from handlers import channel_handler
+
+    rewrite_mock = Recorder("Рерайт поста")
+    monkeypatch.setattr(channel_handler, "rewrite_post", rewrite_mock)
+    monkeypatch.setattr(channel_handler, "_rewrite_cache", channel_handler.OrderedDict())
+    post = {"text": "Текст поста для рерайта", "post_link": "https://t.me/test/1"}
+
+    first = await channel_handler.get_rewrite(post, None, None)
+    second = await channel_handler.get_rewrite(post, None, None)
+
+    assert first == second == "Рерайт поста"
+    rewrite_mock.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_rewrite_skips_cache_on_error(monkeypatch):
+    """Тест что ошибки рерайта не кэшируются"""
+    from handlers import channel_handler
+    from utils.llm_service import REWRITE_ERROR_PREFIX
+
+    rewrite_mock = Recorder(f"{REWRITE_ERROR_PREFIX}timeout]")
+    monkeypatch.setattr(channel_handler, "rewrite_post", rewrite_mock)
+    monkeypatch.setattr(channel_handler, "_rewrite_cache", channel_handler.OrderedDict())
+    post = {"text": "Текст поста для рерайта", "post_link": "https://t.me/test/1"}
+
+    await channel_handler.get_rewrite(post, None, None)
+    await channel_handler.get_rewrite(post, None, None)
+
+    assert rewrite_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_send_rewritten_post_falls_back_to_next_media(mock_message, monkeypatch):
+    """Тест что при ошибке отправки видео используется фото"""
+    from handlers import channel_handler
+
+    monkeypatch.setattr(channel_handler, "get_rewrite", Recorder("Рерайт"))
+    mock_message.answer_video.side_effect = TelegramBadRequest(
+        method=SimpleNamespace(), message="bad file_id"
+    )
+    post = {"text": "Текст поста", "video_file_id": "VID", "photo_file_id": "PHOTO"}
+
+    await channel_handler.send_rewritten_post(mock_message, post, None, None)
+
+    mock_message.answer_video.assert_called_once()
+    mock_message.answer_photo.assert_called_once()
+    assert mock_message.answer_photo.call_args[1]["photo"] == "PHOTO"
+    mock_message.answer.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_send_rewritten_post_text_only(mock_message, monkeypatch):
+    """Тест отправки рерайта текстом, если медиа нет"""
+    from handlers import channel_handler
+
+    monkeypatch.setattr(channel_handler, "get_rewrite", Recorder("Рерайт"))
+    post = {"text": "Текст поста"}
+
+    await channel_handler.send_rewritten_post(mock_message, post, None, None)
+
+    mock_message.answer.assert_called_once()
+    assert mock_message.answer.call_args[0][0] == "Рерайт"
+
+
+@pytest.mark.asyncio
+async def test_send_rewritten_post_network_error_falls_back_to_text(mock_message, monkeypatch):
+    """Тест что сетевая ошибка при отправке видео ссылкой не теряет ответ"""
+    from handlers import channel_handler
+
+    monkeypatch.setattr(channel_handler, "get_rewrite", Recorder("Рерайт"))
+    monkeypatch.setattr(channel_handler, "_link_fetch_failures", {})
+    monkeypatch.setattr(
+        channel_handler, "get_session", Recorder(side_effect=aiohttp.ClientError("down"))
+    )
+    mock_message.answer_video.side_effect = TelegramNetworkError(
+        method=SimpleNamespace(), message="Request timeout"
+    )
+    post = {"text": "Текст поста", "video_url": "https://cdn.example.org/video.mp4"}
+
+    await channel_handler.send_rewritten_post(mock_message, post, None, None)
+
+    mock_message.answer_video.assert_called_once()
+    assert mock_message.answer.call_args[0][0] == "Рерайт"
+    assert channel_handler._link_fetch_failures == {}
+
+
+@pytest.mark.asyncio
+async def test_send_by_link_failure_is_scoped_to_media_type(mock_message, monkeypatch):
+    """Тест что отказ Telegram скачать видео по URL не блокирует фото с того же хоста"""
+    from handlers import channel_handler
+
+    monkeypatch.setattr(channel_handler, "_link_fetch_failures", {})
+    mock_message.answer_video.side_effect = TelegramBadRequest(
+        method=SimpleNamespace(), message="Bad Request: failed to get HTTP URL content"
+    )
+
+    assert not await channel_handler._send_by_link(
+        mock_message.answer_video, "video", "https://cdn.example.org/v.mp4", "Подпись"
+    )
+    assert not await channel_handler._send_by_link(
+        mock_message.answer_video, "video", "https://cdn.example.org/v2.mp4", "Подпись"
+    )
+    assert await channel_handler._send_by_link(
+        mock_message.answer_photo, "photo", "https://cdn.example.org/p.jpg", "Подпись"
+    )
+    mock_message.answer_video.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_send_photo_by_url_uses_link_first(mock_message, monkeypatch):
+    """Тест что фото по URL сначала отправляется ссылкой, без скачивания ботом"""
+    from handlers import channel_handler
+
+    monkeypatch.setattr(channel_handler, "_link_fetch_failures", {})
+    get_session = Recorder()
+    monkeypatch.setattr(channel_handler, "get_session", get_session)
+    url = "https://cdn.example.org/photo.jpg"
+
+    assert await channel_handler._send_photo_by_url(mock_message, url, "Подпись")
+
+    assert mock_message.answer_photo.call_args[1]["photo"] == url
+    get_session.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_channel_posts_uses_cache(monkeypatch):
+    """Тест что повторный скан канала в пределах TTL не обращается к t.me"""
+    from handlers import channel_handler
+
+    scraper = SimpleNamespace(
+        fetch_posts=Recorder([{"text": "Пост", "post_link": "https://t.me/test_channel/1"}])
+    )
+    monkeypatch.setattr(channel_handler, "get_scraper", lambda: scraper)
+    monkeypatch.setattr(channel_handler, "_channel_cache", {})
+
+    first = await channel_handler.get_channel_posts("@test_channel")
+    second = await channel_handler.get_channel_posts("https://t.me/test_channel")
+
+    assert first == second
+    scraper.fetch_posts.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text, expected_post",
+    [
+        ("https://t.me/prog_ai/345", ("prog_ai", 345)),
+        ("https://t.me/my-channel/12", ("my-channel", 12)),
+        ("@prog_ai/345", ("prog_ai", 345)),
+    ],
+)
+async def test_handle_channel_link_routes_post_links(
+    mock_message, mock_state, monkeypatch, text, expected_post
+):
+    """Тест что ссылки на пост уходят в рерайт поста (быстрый и общий путь)"""
+    from handlers import channel_handler
+
+    direct = Recorder()
+    monkeypatch.setattr(channel_handler, "handle_direct_post_link", direct)
+    mock_message.text = text
+
+    await channel_handler.handle_channel_link(mock_message, mock_state)
+
+    assert direct.call_args[0][2] == expected_post
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("text", ["prog_ai", "@prog_ai", "https://t.me/s/prog_ai"])
+async def test_handle_channel_link_routes_channels(mock_message, mock_state, monkeypatch, text):
+    """Тест что ссылки и имена каналов уходят в сканирование канала"""
+    from handlers import channel_handler
+
+    scan = Recorder()
+    monkeypatch.setattr(channel_handler, "handle_channel_scan", scan)
+    mock_message.text = text
+
+    await channel_handler.handle_channel_link(mock_message, mock_state)
+
+    scan.assert_called_once()
+    assert scan.call_args[0][2].lstrip("@").endswith("prog_ai")
+
+
+@pytest.mark.asyncio
+async def test_cmd_help_reuses_uploaded_image(mock_message, monkeypatch):
+    """Тест что после первой загрузки картинка /help отправляется по file_id"""
+    from handlers import start_handler
+
+    monkeypatch.setattr(start_handler, "INSTRUCTION_IMAGE", object())
+    monkeypatch.setattr(start_handler, "_instruction_file_id", None)
+    mock_message.answer_photo = Recorder(sent_message("small", "FILE_ID"))
+
+    await cmd_help(mock_message)
+    await cmd_help(mock_message)
+
+    first, second = mock_message.answer_photo.call_args_list
+    assert first[1]["photo"] is start_handler.INSTRUCTION_IMAGE
+    assert second[1]["photo"] == "FILE_ID"
+
+
+@pytest.mark.asyncio
+async def test_callback_select_model_same_model_is_noop(mock_state):
+    """Тест что повторный выбор текущей модели не трогает FSM и сообщение"""
+    from handlers.start_handler import callback_select_model
+
+    model = AVAILABLE_MODELS[-1]
+    mock_state.get_data.return_value = {"selected_model": model}
+    callback = make_callback(f"model:{model}")
+
+    await callback_select_model(callback, mock_state)
+
+    mock_state.update_data.assert_not_called()
+    callback.message.edit_text.assert_not_called()
+    callback.answer.assert_called_once_with("✅ Уже выбрано", show_alert=False)
+
+
+@pytest.mark.asyncio
+async def test_callback_select_model_updates_model(mock_state):
+    """Тест смены модели через inline-кнопку"""
+    from handlers.start_handler import callback_select_model
+
+    model = next(m for m in AVAILABLE_MODELS if m != OLLAMA_MODEL)
+    mock_state.get_data.return_value = {}
+    callback = make_callback(f"model:{model}")
+
+    await callback_select_model(callback, mock_state)
+
+    mock_state.update_data.assert_called_once_with(selected_model=model)
+    assert model in callback.message.edit_text.call_args[0][0]
+    callback.answer.assert_called_once_with()
@@ -111,6 +111,28 @@ def test_format_summary_truncates_long_text():
     assert "А" in result
 
 
+def test_format_summary_truncates_on_post_boundary():
+    """Тест что длинная сводка обрезается целыми постами и не превышает лимит"""
+    from config import MAX_MESSAGE_LENGTH
+
+    posts = [
+        {
+            "post_link": f"https://t.me/test_channel/{i + 1}",
+            "text": "Длинный текст " * 30,
+            "views": 1000,
+            "forwards": 50,
+            "media_type": {"type": "text", "has_text": True, "media_count": 0},
+        }
+        for i in range(20)
+    ]
+
+    result = format_summary(posts)
+
+    assert len(result) <= MAX_MESSAGE_LENGTH
+    assert result.endswith("⚠️ Сообщение обрезано (слишком много постов)")
+    assert result.count("<a ") == result.count("</a>")
+
+
 def test_format_summary_respects_max_posts():
     """Тест что форматирование ограничивает количество постов"""
     from config import MAX_POSTS_IN_SUMMARY
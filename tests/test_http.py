@@ -1,5 +1,8 @@
 """Тесты для HTTP healthcheck сервера"""
 
+import socket
+
+import aiohttp
 import pytest
 from aiohttp import web
 from utils.http import health_handler, start_healthcheck_server
@@ -11,13 +14,12 @@ async def test_health_endpoint_returns_ok(aiohttp_client):
     app = web.Application()
     app.router.add_get("/health", health_handler)
 
-    factory = aiohttp_client
-    async for client in factory(app):
-        resp = await client.get("/health")
+    client = await aiohttp_client(app)
+    resp = await client.get("/health")
 
-        assert resp.status == 200
-        text = await resp.text()
-        assert text == "OK"
+    assert resp.status == 200
+    text = await resp.text()
+    assert text == "OK"
 
 
 @pytest.mark.asyncio
@@ -26,15 +28,14 @@ async def test_health_endpoint_is_get_only(aiohttp_client):
     app = web.Application()
     app.router.add_get("/health", health_handler)
 
-    factory = aiohttp_client
-    async for client in factory(app):
-        # GET должен работать
-        resp = await client.get("/health")
-        assert resp.status == 200
+    client = await aiohttp_client(app)
+    # GET должен работать
+    resp = await client.get("/health")
+    assert resp.status == 200
 
-        # POST должен вернуть 405 (Method Not Allowed)
-        resp = await client.post("/health")
-        assert resp.status == 405
+    # POST должен вернуть 405 (Method Not Allowed)
+    resp = await client.post("/health")
+    assert resp.status == 405
 
 
 @pytest.mark.asyncio
@@ -50,6 +51,24 @@ async def test_healthcheck_server_starts():
         await runner.cleanup()
 
 
+@pytest.mark.asyncio
+async def test_healthcheck_server_on_prebound_socket():
+    """Тест запуска healthcheck сервера на заранее привязанном сокете"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    runner = await start_healthcheck_server(sock=sock)
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/health") as resp:
+                assert resp.status == 200
+                assert await resp.text() == "OK"
+    finally:
+        await runner.cleanup()
+        sock.close()
+
+
 @pytest.mark.asyncio
 async def test_healthcheck_server_custom_endpoint(aiohttp_client):
     """Тест healthcheck сервера с кастомным эндпоинтом"""
@@ -57,10 +76,9 @@ async def test_healthcheck_server_custom_endpoint(aiohttp_client):
     app = web.Application()
     app.router.add_get(endpoint, health_handler)
 
-    factory = aiohttp_client
-    async for client in factory(app):
-        resp = await client.get(endpoint)
+    client = await aiohttp_client(app)
+    resp = await client.get(endpoint)
 
-        assert resp.status == 200
-        text = await resp.text()
-        assert text == "OK"
+    assert resp.status == 200
+    text = await resp.text()
+    assert text == "OK"
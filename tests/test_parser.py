@@ -1,7 +1,50 @@
 """Tests for parser module - URL detection and post fetching"""
 
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiohttp
 import pytest
-from utils.parser import parse_post_link, _normalize_channel
+from utils import parser
+from utils.parser import (
+    TelegramWebError,
+    TelegramWebScraper,
+    _extract_media,
+    _make_soup,
+    _normalize_channel,
+    _parse_counter,
+    fetch_posts_sync,
+    parse_post_link,
+)
+
+
+def _message_html(slug: str, msg_id: int, text: str) -> str:
+    """HTML одного сообщения в верстке t.me/s/"""
+    return (
+        f'<div class="tgme_widget_message" data-post="{slug}/{msg_id}">'
+        f'<div class="tgme_widget_message_text">{text}</div>'
+        f'<span class="tgme_widget_message_views">1.2K</span>'
+        f'<a class="tgme_widget_message_date" href="https://t.me/{slug}/{msg_id}">'
+        f'<time datetime="2024-01-01T10:00:00+00:00"></time></a>'
+        f"</div>"
+    )
+
+
+def _page_html(slug: str, ids) -> str:
+    """Страница канала: сообщения в порядке документа (старые сверху)"""
+    return "".join(_message_html(slug, i, f"Post {i}") for i in ids)
+
+
+def _stub_get(monkeypatch, responses: dict) -> list:
+    """Подменяет TelegramWebScraper._get ответами по URL; возвращает список запросов"""
+    calls = []
+
+    async def fake_get(self, url):
+        calls.append(url)
+        return responses[url]
+
+    monkeypatch.setattr(TelegramWebScraper, "_get", fake_get)
+    return calls
 
 
 class TestParsePostLink:
@@ -140,3 +183,342 @@ class TestNormalizeChannelBackwardCompat:
         """Test plain channel name"""
         result = _normalize_channel("prog_ai")
         assert result == "prog_ai"
+
+
+class TestTelegramWebScraper:
+    """Tests for scraping channel pages and single posts (HTTP layer stubbed)"""
+
+    BASE = "https://t.me/s/test_chan"
+
+    @pytest.mark.asyncio
+    async def test_fetch_posts_paginates_newest_first(self, monkeypatch):
+        """Test that pages follow the before= cursor and posts come newest first"""
+        calls = _stub_get(
+            monkeypatch,
+            {
+                self.BASE: (200, False, _page_html("test_chan", [5, 6, 7])),
+                f"{self.BASE}?before=5": (200, False, _page_html("test_chan", [2, 3, 4])),
+                f"{self.BASE}?before=2": (200, False, _page_html("test_chan", [1])),
+            },
+        )
+
+        posts = await TelegramWebScraper().fetch_posts("@test_chan", pages=5)
+
+        assert [p["text"] for p in posts] == [f"Post {i}" for i in range(7, 0, -1)]
+        assert posts[0]["post_link"] == "https://t.me/test_chan/7"
+        assert posts[0]["views"] == 1200
+        assert all("message_id" not in p for p in posts)
+        # Пост с ID 1 — последний: следующей страницы нет
+        assert calls == [self.BASE, f"{self.BASE}?before=5", f"{self.BASE}?before=2"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_posts_respects_pages_limit(self, monkeypatch):
+        """Test that pagination stops after the requested number of pages"""
+        calls = _stub_get(
+            monkeypatch, {self.BASE: (200, False, _page_html("test_chan", [5, 6, 7]))}
+        )
+
+        posts = await TelegramWebScraper().fetch_posts("test_chan", pages=1)
+
+        assert len(posts) == 3
+        assert calls == [self.BASE]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "status, redirected, error",
+        [
+            (200, True, "Контент недоступен"),
+            (404, False, "Канал не найден"),
+            (403, False, "HTTP 403"),
+            (429, False, "HTTP 429"),
+            (500, False, "статус 500"),
+        ],
+    )
+    async def test_fetch_posts_maps_http_errors(self, monkeypatch, status, redirected, error):
+        """Test that redirects and HTTP errors become TelegramWebError"""
+        _stub_get(monkeypatch, {self.BASE: (status, redirected, "")})
+
+        with pytest.raises(TelegramWebError, match=error):
+            await TelegramWebScraper().fetch_posts("@test_chan")
+
+    @pytest.mark.asyncio
+    async def test_fetch_posts_empty_page_raises(self, monkeypatch):
+        """Test that a page without messages is reported as a parse error"""
+        _stub_get(monkeypatch, {self.BASE: (200, False, "<html></html>")})
+
+        with pytest.raises(TelegramWebError):
+            await TelegramWebScraper().fetch_posts("@test_chan")
+
+    @pytest.mark.asyncio
+    async def test_fetch_single_post(self, monkeypatch):
+        """Test that the post with the requested ID is picked from the page"""
+        _stub_get(
+            monkeypatch,
+            {f"{self.BASE}/10": (200, False, _page_html("test_chan", [9, 10, 11]))},
+        )
+
+        post = await TelegramWebScraper().fetch_single_post("https://t.me/test_chan", 10)
+
+        assert post["post_link"] == "https://t.me/test_chan/10"
+        assert post["text"] == "Post 10"
+        assert post["channel_slug"] == "test_chan"
+        assert post["posted_at"].year == 2024
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "status, redirected, html, error",
+        [
+            (200, True, "", "Пост недоступен"),
+            (404, False, "", "Пост не найден"),
+            (403, False, "", "HTTP 403"),
+            (200, False, _page_html("test_chan", [9, 11]), "не найден на странице"),
+        ],
+    )
+    async def test_fetch_single_post_errors(
+        self, monkeypatch, status, redirected, html, error
+    ):
+        """Test error mapping for direct post requests"""
+        _stub_get(monkeypatch, {f"{self.BASE}/10": (status, redirected, html)})
+
+        with pytest.raises(TelegramWebError, match=error):
+            await TelegramWebScraper().fetch_single_post("test_chan", 10)
+
+    def test_fetch_posts_sync_wrapper(self, monkeypatch):
+        """Test the asyncio.run wrapper for standalone usage"""
+        _stub_get(monkeypatch, {self.BASE: (200, False, _page_html("test_chan", [1, 2]))})
+
+        posts = fetch_posts_sync("@test_chan")
+
+        assert [p["text"] for p in posts] == ["Post 2", "Post 1"]
+
+
+class _FakeResponse:
+    """Ответ aiohttp с нужным статусом"""
+
+    def __init__(self, status: int, text: str = "<html></html>"):
+        self.status = status
+        self.history = ()
+        self._text = text
+
+    async def text(self) -> str:
+        return self._text
+
+
+class _FakeSession:
+    """Сессия, отдающая заранее заданные ответы/исключения по очереди"""
+
+    closed = False
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    @asynccontextmanager
+    async def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        yield outcome
+
+
+class TestScraperRetries:
+    """Tests for transient-error retries in TelegramWebScraper._get"""
+
+    @pytest.fixture(autouse=True)
+    def _no_backoff(self, monkeypatch):
+        monkeypatch.setattr(parser, "_RETRY_BACKOFF", 0)
+
+    @pytest.mark.asyncio
+    async def test_retries_gateway_errors_until_success(self):
+        """Test that 502/503/504 are retried and the successful response returned"""
+        session = _FakeSession([_FakeResponse(503), _FakeResponse(502), _FakeResponse(200, "ok")])
+
+        result = await TelegramWebScraper(session=session)._get("https://t.me/s/chan")
+
+        assert result == (200, False, "ok")
+        assert session.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_returns_last_response_after_max_retries(self):
+        """Test that the last gateway error is returned once retries are exhausted"""
+        session = _FakeSession([_FakeResponse(504)] * (parser._MAX_RETRIES + 1))
+
+        status, _, _ = await TelegramWebScraper(session=session)._get("https://t.me/s/chan")
+
+        assert status == 504
+        assert session.calls == parser._MAX_RETRIES + 1
+
+    @pytest.mark.asyncio
+    async def test_other_statuses_are_not_retried(self):
+        """Test that non-gateway statuses are returned immediately"""
+        session = _FakeSession([_FakeResponse(404)])
+
+        status, _, _ = await TelegramWebScraper(session=session)._get("https://t.me/s/chan")
+
+        assert status == 404
+        assert session.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_connection_errors(self):
+        """Test that a dropped connection is retried"""
+        session = _FakeSession(
+            [aiohttp.ServerDisconnectedError(), _FakeResponse(200, "ok")]
+        )
+
+        result = await TelegramWebScraper(session=session)._get("https://t.me/s/chan")
+
+        assert result == (200, False, "ok")
+        assert session.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_connection_error_on_last_try_raises(self):
+        """Test that TelegramWebError is raised when every attempt fails to connect"""
+        session = _FakeSession(
+            [aiohttp.ClientConnectionError("refused")] * (parser._MAX_RETRIES + 1)
+        )
+
+        with pytest.raises(TelegramWebError, match="refused"):
+            await TelegramWebScraper(session=session)._get("https://t.me/s/chan")
+        assert session.calls == parser._MAX_RETRIES + 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "error", [asyncio.TimeoutError(), aiohttp.ServerTimeoutError("slow")]
+    )
+    async def test_timeout_is_not_retried(self, error):
+        """Test that timeouts fail immediately without further attempts"""
+        session = _FakeSession([error, _FakeResponse(200)])
+
+        with pytest.raises(TelegramWebError):
+            await TelegramWebScraper(session=session)._get("https://t.me/s/chan")
+        assert session.calls == 1
+
+
+def _media(type_: str, count: int, has_text: bool = False) -> dict:
+    return {"type": type_, "has_text": has_text, "media_count": count}
+
+
+_PHOTO_WRAP = (
+    '<a class="tgme_widget_message_photo_wrap" '
+    "style=\"width:800px;background-image:url('https://cdn.t.me/{name}.jpg')\"></a>"
+)
+
+
+class TestExtractMedia:
+    """Tests for media type and URL detection on fixture message HTML"""
+
+    @pytest.mark.parametrize(
+        "inner, has_text, expected",
+        [
+            pytest.param("", True, (_media("text", 0, True), None, None), id="text-only"),
+            pytest.param(
+                _PHOTO_WRAP.format(name="wrap")
+                + '<div class="tgme_widget_message_photo"></div>',
+                False,
+                (_media("photo", 1), "https://cdn.t.me/wrap.jpg", None),
+                id="photo-wrap-style",
+            ),
+            pytest.param(
+                '<img class="tgme_widget_message_photo" src="//cdn.t.me/img.jpg">',
+                True,
+                (_media("photo", 1, True), "https://cdn.t.me/img.jpg", None),
+                id="photo-img-src",
+            ),
+            pytest.param(
+                '<img class="tgme_widget_message_user_photo" src="https://cdn.t.me/avatar.jpg">'
+                '<img src="https://cdn.t.me/content.jpg">',
+                False,
+                (_media("text", 0), "https://cdn.t.me/content.jpg", None),
+                id="skips-user-avatar",
+            ),
+            pytest.param(
+                '<div class="tgme_widget_message_video_player">'
+                '<i class="tgme_widget_message_video_thumb" '
+                "style=\"background-image:url('https://cdn.t.me/thumb.jpg')\"></i>"
+                '<video class="tgme_widget_message_video" src="https://cdn.t.me/v.mp4"></video>'
+                "</div>",
+                True,
+                (
+                    _media("video", 1, True),
+                    "https://cdn.t.me/thumb.jpg",
+                    "https://cdn.t.me/v.mp4",
+                ),
+                id="video-src",
+            ),
+            pytest.param(
+                '<div class="tgme_widget_message_video_player">'
+                '<video><source src="//cdn.t.me/s.mp4"></video></div>',
+                False,
+                (_media("text", 0), None, "https://cdn.t.me/s.mp4"),
+                id="video-source-tag",
+            ),
+            pytest.param(
+                '<div class="tgme_widget_message_video_wrap" data-src="https://cdn.t.me/d.mp4">'
+                "</div>",
+                False,
+                (_media("text", 0), None, "https://cdn.t.me/d.mp4"),
+                id="video-data-src-fallback",
+            ),
+            pytest.param(
+                "".join(_PHOTO_WRAP.format(name=f"g{i}") for i in range(3)),
+                True,
+                (_media("gallery", 3, True), "https://cdn.t.me/g0.jpg", None),
+                id="gallery-count",
+            ),
+            pytest.param(
+                '<div class="tgme_widget_message_document"></div>'
+                '<div class="tgme_widget_message_voice"></div>'
+                '<div class="tgme_widget_message_poll"></div>'
+                + _PHOTO_WRAP.format(name="p"),
+                False,
+                (_media("poll", 1), "https://cdn.t.me/p.jpg", None),
+                id="poll-beats-voice-document-photo",
+            ),
+            pytest.param(
+                '<div class="tgme_widget_message_document"></div>'
+                '<div class="tgme_widget_message_voice"></div>',
+                False,
+                (_media("voice", 1), None, None),
+                id="voice-beats-document",
+            ),
+            pytest.param(
+                '<div class="tgme_widget_message_document"></div>'
+                '<video class="tgme_widget_message_video" src="https://cdn.t.me/v.mp4"></video>',
+                False,
+                (_media("document", 1), None, "https://cdn.t.me/v.mp4"),
+                id="document-beats-video",
+            ),
+        ],
+    )
+    def test_extract_media(self, inner, has_text, expected):
+        """Test (media_type, photo_url, video_url) for typical post layouts"""
+        message = _make_soup(
+            f'<div class="tgme_widget_message" data-post="chan/1">{inner}</div>'
+        ).select_one(".tgme_widget_message")
+
+        assert _extract_media(message, has_text) == expected
+
+
+class TestParseCounter:
+    """Tests for view/forward counter parsing"""
+
+    @pytest.mark.parametrize(
+        "raw, expected",
+        [
+            ("1 234", 1234),
+            ("987", 987),
+            ("5K", 5000),
+            ("1.2K", 1200),
+            ("3,5M", 3500000),
+            ("12M", 12000000),
+            ("2.5k", 2500),
+            ("", 0),
+            ("abc", 0),
+            ("views: 42", 42),
+        ],
+    )
+    def test_parse_counter(self, raw, expected):
+        """Test plain, spaced, suffixed and malformed counters"""
+        assert _parse_counter(raw) == expected
+
@@ -1,12 +1,19 @@
 """Утилиты и основные модули бота"""
 
-from .parser import TelegramWebScraper, TelegramWebError
-from .llm_service import rewrite_post
-from .formatter import format_summary
-from .states import PostSelectionState
-from .http import start_healthcheck_server, health_handler
-from .post_types import get_post_emoji
-from .text_utils import truncate_text
+import importlib
+
+# Символ -> подмодуль; импорт выполняется при первом обращении (PEP 562)
+_LAZY_IMPORTS = {
+    "TelegramWebScraper": "parser",
+    "TelegramWebError": "parser",
+    "rewrite_post": "llm_service",
+    "format_summary": "formatter",
+    "PostSelectionState": "states",
+    "start_healthcheck_server": "http",
+    "health_handler": "http",
+    "get_post_emoji": "post_types",
+    "truncate_text": "text_utils",
+}
 
 __all__ = [
     "TelegramWebScraper",
@@ -19,3 +26,16 @@ __all__ = [
     "get_post_emoji",
     "truncate_text",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
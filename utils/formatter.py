@@ -15,37 +15,44 @@ def format_summary(posts: List[dict]) -> str:
 
     posts = posts[:MAX_POSTS_IN_SUMMARY]
 
-    header = [
-        f"📊 <b>Сводка канала</b> ({len(posts)} постов)\n",
-        f"💡 <i>Отправь номер поста (1-{len(posts)}) для рерайта</i>\n",
-        "=" * 40,
+    # Один плоский список фрагментов и одна склейка в конце
+    chunks = [
+        f"📊 <b>Сводка канала</b> ({len(posts)} постов)\n\n"
+        f"💡 <i>Отправь номер поста (1-{len(posts)}) для рерайта</i>\n\n"
+        + "=" * 40
     ]
+    append = chunks.append
+    separator = "\n" + "-" * 40
+    total = len(chunks[0])
+    # Граница последнего поста, после которого ещё остаётся запас под пометку об обрезке
+    cut = len(chunks)
 
-    post_lines = []
     for i, p in enumerate(posts, 1):
-        parts = [f"\n{get_post_emoji(p)} <b>Пост #{i}</b>"]
-        
+        start = len(chunks)
+        append(f"\n\n{get_post_emoji(p)} <b>Пост #{i}</b>")
+
         if link := p.get("post_link"):
-            parts.append(f'🔗 <a href="{link}">Открыть</a>')
-            
+            append(f'\n🔗 <a href="{link}">Открыть</a>')
+
         views = p.get("views", 0)
         forwards = p.get("forwards", 0)
-        parts.append(f"👁 {views:,} | 📤 {forwards:,}")
-        
+        append(f"\n👁 {views:,} | 📤 {forwards:,}")
+
         if p.get("is_forwarded"):
-            parts.append("↪️ <i>Forwarded</i>")
-            
+            append("\n↪️ <i>Forwarded</i>")
+
         if text := p.get("text"):
-            parts.append(f"📝 {truncate_text(text, 200)}")
-            
-        parts.append("-" * 40)
-        post_lines.append("\n".join(parts))
-
-    result = "\n".join(header + post_lines)
-
-    return (
-        result[: MAX_MESSAGE_LENGTH - 100]
-        + "\n\n⚠️ Сообщение обрезано (слишком много постов)"
-        if len(result) > MAX_MESSAGE_LENGTH
-        else result
-    )
+            append(f"\n📝 {truncate_text(text, 200)}")
+
+        append(separator)
+
+        total += sum(map(len, chunks[start:]))
+        if total > MAX_MESSAGE_LENGTH:
+            # Дальше не строим: обрезаем по границе поста, чтобы не рвать HTML-теги
+            del chunks[cut:]
+            append("\n\n⚠️ Сообщение обрезано (слишком много постов)")
+            break
+        if total <= MAX_MESSAGE_LENGTH - 100:
+            cut = len(chunks)
+
+    return "".join(chunks)
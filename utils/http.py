@@ -2,23 +2,43 @@
 
 from aiohttp import web
 import logging
+import socket
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Тело ответа healthcheck не меняется — кодируем один раз
+_OK_BODY = b"OK"
+
 
 async def health_handler(_request):
     """Обработчик healthcheck запроса"""
-    return web.Response(text="OK", status=200)
-
-
-async def start_healthcheck_server(port: int = 8080, endpoint: str = "/health"):
-    """Запуск HTTP сервера для healthcheck"""
-    app = web.Application()
+    # web.Response нельзя отправить дважды, поэтому переиспользуем только тело
+    return web.Response(body=_OK_BODY, status=200, content_type="text/plain")
+
+
+async def start_healthcheck_server(
+    port: int = 8080,
+    endpoint: str = "/health",
+    app: Optional[web.Application] = None,
+    sock: Optional[socket.socket] = None,
+):
+    """
+    Запуск HTTP сервера для healthcheck (при переданном app — рядом с его маршрутами).
+
+    Если передан sock, сервер слушает уже привязанный сокет вместо порта port.
+    """
+    app = app or web.Application()
     app.router.add_get(endpoint, health_handler)
 
-    runner = web.AppRunner(app)
+    # Без access-лога: пробы Kubernetes не пишут строку в лог на каждый запрос
+    runner = web.AppRunner(app, access_log=None)
     await runner.setup()
-    await web.TCPSite(runner, "0.0.0.0", port).start()
+    if sock is not None:
+        port = sock.getsockname()[1]
+        await web.SockSite(runner, sock).start()
+    else:
+        await web.TCPSite(runner, "0.0.0.0", port).start()
 
     logger.info("Healthcheck сервер запущен на порту %s, эндпоинт: %s", port, endpoint)
     return runner
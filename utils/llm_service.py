@@ -1,8 +1,8 @@
 """Сервис для работы с LLM через LangChain + Ollama Cloud"""
 
 import logging
-import asyncio
 import os
+from functools import lru_cache
 from typing import Optional
 
 from langchain_ollama import ChatOllama
@@ -22,6 +22,21 @@ logger = logging.getLogger(__name__)
 if OLLAMA_API_KEY:
     os.environ["OLLAMA_API_KEY"] = OLLAMA_API_KEY
 
+# Префикс ответа rewrite_post при ошибке LLM (по нему вызывающий код отличает ошибку)
+REWRITE_ERROR_PREFIX = "[Ошибка рерайта: "
+
+# Шаблон промпта разбирается один раз при импорте
+_PROMPT = ChatPromptTemplate.from_template(
+    "{instruction}\n\nОригинальный пост:\n{text}\n\nРерайт:"
+)
+
+
+@lru_cache(maxsize=8)
+def _get_chain(model: str):
+    """Цепочка промпт | LLM для модели; клиент и его пул соединений переиспользуются"""
+    llm = ChatOllama(base_url=OLLAMA_BASE_URL, model=model, temperature=LLM_TEMPERATURE)
+    return _PROMPT | llm
+
 
 async def rewrite_post(
     post: dict, custom_prompt: Optional[str] = None, model: Optional[str] = None
@@ -31,18 +46,10 @@ async def rewrite_post(
         return "Пост слишком короткий для рерайта"
 
     current_model = model or OLLAMA_MODEL
-    current_llm = ChatOllama(
-        base_url=OLLAMA_BASE_URL, model=current_model, temperature=LLM_TEMPERATURE
-    )
-
-    prompt = ChatPromptTemplate.from_template(
-        "{instruction}\n\nОригинальный пост:\n{text}\n\nРерайт:"
-    )
 
     try:
-        result = await asyncio.to_thread(
-            (prompt | current_llm).invoke,
-            {"instruction": custom_prompt or DEFAULT_REWRITE_PROMPT, "text": text},
+        result = await _get_chain(current_model).ainvoke(
+            {"instruction": custom_prompt or DEFAULT_REWRITE_PROMPT, "text": text}
         )
         return (
             result.content.strip()
@@ -56,4 +63,4 @@ async def rewrite_post(
             current_model,
             e,
         )
-        return "[Ошибка рерайта: %s]" % e
+        return f"{REWRITE_ERROR_PREFIX}{e}]"
@@ -1,16 +1,23 @@
 """
 Standalone модуль для парсинга Telegram каналов через веб t.me/s/
 
-Примеры использования:
+Примеры использования (внутри корутины):
     from parser import TelegramWebScraper
 
     scraper = TelegramWebScraper()
 
     # Спарсить 1 страницу канала
-    posts = scraper.fetch_posts("@channelname")
+    posts = await scraper.fetch_posts("@channelname")
 
     # Спарсить 3 страницы канала
-    posts = scraper.fetch_posts("https://t.me/channelname", pages=3)
+    posts = await scraper.fetch_posts("https://t.me/channelname", pages=3)
+
+    await scraper.close()
+
+Синхронно (скрипты, CLI — вне запущенного event loop):
+    from parser import fetch_posts_sync
+
+    posts = fetch_posts_sync("@channelname", pages=3)
 
     # Обработать результаты
     for post in posts:
@@ -21,25 +28,97 @@ Standalone модуль для парсинга Telegram каналов чере
         print(f"Медиа: {'Да' if post['has_media'] else 'Нет'}")
 """
 
+from __future__ import annotations
+
+import asyncio
 import logging
 import re
+from importlib.util import find_spec
+from functools import lru_cache
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+
+import aiohttp
 
-import requests
-from bs4 import BeautifulSoup
-from bs4.element import Tag
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from bs4.element import Tag
 
 logger = logging.getLogger(__name__)
 
 # Максимум страниц за один запрос
 MAX_PAGES = 20
 
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=15)
+
+# Повторы запроса к t.me при обрыве соединения и временных ошибках прокси/балансировщика
+_RETRY_STATUSES = frozenset({502, 503, 504})
+_MAX_RETRIES = 2
+_RETRY_BACKOFF = 0.3
+
+# lxml строит дерево на C в разы быстрее встроенного html.parser; без него — fallback
+_HTML_PARSER = "lxml" if find_spec("lxml") else "html.parser"
+
+# Регулярные выражения для ссылок на Telegram (компилируются один раз)
+_TME_URL_PREFIX_RE = re.compile(r"^https?://t\.me/(s/)?", re.IGNORECASE)
+# Префиксы ссылок на пост: длинные варианты раньше коротких
+_TME_POST_PREFIXES = (
+    "https://t.me/s/",
+    "http://t.me/s/",
+    "https://t.me/",
+    "http://t.me/",
+    "t.me/s/",
+    "t.me/",
+)
+_TME_PREFIX_MAX_LEN = len(_TME_POST_PREFIXES[0])
+_CHANNEL_USERNAME_RE = re.compile(r"^[a-zA-Z0-9_]+$")
+
+# Регулярные выражения для разбора HTML поста
+_URL_IN_STYLE_RE = re.compile(r"url\(['\"]?(.*?)['\"]?\)")
+_COUNTER_RE = re.compile(r"([0-9]+(?:[\.,][0-9]+)?)([KM]?)")
+_NON_DIGIT_RE = re.compile(r"\D")
+
+# Классы элементов с медиа в порядке приоритета при поиске ссылки на фото/видео
+_PHOTO_CLASSES = (
+    "tgme_widget_message_photo_wrap",
+    "tgme_widget_message_photo",
+    "tgme_widget_message_video_thumb",
+    "tgme_widget_message_video_player",
+)
+_VIDEO_CLASSES = (
+    "tgme_widget_message_video",
+    "tgme_widget_message_video_player",
+    "tgme_widget_message_video_wrap",
+)
+# Признаки пересланного поста — один селектор вместо двух проходов
+_FORWARDED_SELECTOR = (
+    ".tgme_widget_message_forwarded_from, .tgme_widget_message_forwarded_post_author"
+)
+# Класс элемента -> тип поста
+_MEDIA_TYPE_CLASSES = {
+    "tgme_widget_message_poll": "poll",
+    "tgme_widget_message_voice": "voice",
+    "tgme_widget_message_document": "document",
+    "tgme_widget_message_video": "video",
+    "tgme_widget_message_photo": "photo",
+}
+
+# Множители суффиксов счетчиков просмотров/пересылок
+_COUNTER_MULTIPLIERS = {"": 1, "K": 1_000, "M": 1_000_000}
+
+
+def _make_soup(html: str) -> BeautifulSoup:
+    """Строит дерево HTML; bs4 импортируется при первом разборе, а не при старте бота"""
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, _HTML_PARSER)
+
 
 class TelegramWebError(Exception):
     """Базовая ошибка при работе с веб-версией Telegram."""
 
 
+@lru_cache(maxsize=1024)
 def is_valid_channel_username(username: str) -> bool:
     """
     Проверяет, соответствует ли имя канала правилам Telegram.
@@ -58,7 +137,7 @@ def is_valid_channel_username(username: str) -> bool:
         return False
 
     # Проверка символов: только латиница, цифры, подчеркивание
-    if not re.match(r"^[a-zA-Z0-9_]+$", clean):
+    if not _CHANNEL_USERNAME_RE.match(clean):
         return False
 
     # Не должно начинаться с цифры
@@ -68,6 +147,7 @@ def is_valid_channel_username(username: str) -> bool:
     return True
 
 
+@lru_cache(maxsize=1024)
 def _normalize_channel(channel: str) -> str:
     """
     Нормализует название канала из различных форматов.
@@ -90,7 +170,7 @@ def _normalize_channel(channel: str) -> str:
         Нормализованное название канала (без @ и домена)
     """
     cleaned = channel.strip()
-    cleaned = re.sub(r"^https?://t\.me/(s/)?", "", cleaned, flags=re.IGNORECASE)
+    cleaned = _TME_URL_PREFIX_RE.sub("", cleaned)
     cleaned = cleaned.lstrip("@")
     return cleaned.split("/")[0]
 
@@ -109,6 +189,7 @@ def normalize_channel_link(channel: str) -> str:
     return f"https://t.me/{slug}"
 
 
+@lru_cache(maxsize=1024)
 def parse_post_link(url: str) -> Optional[tuple[str, int]]:
     """
     Проверяет, является ли URL прямой ссылкой на пост, и извлекает канал и ID.
@@ -129,26 +210,18 @@ def parse_post_link(url: str) -> Optional[tuple[str, int]]:
     """
     cleaned = url.strip()
 
-    # Удаляем протокол и домен (https?://t.me/)
-    cleaned = re.sub(r"^https?://t\.me/(s/)?", "", cleaned, flags=re.IGNORECASE)
-
-    # Если нет https://, пробуем удалить t.me/ в начале
-    if cleaned == url.strip():
-        cleaned = re.sub(r"^t\.me/(s/)?", "", cleaned, flags=re.IGNORECASE)
+    # Удаляем протокол и домен без regex: префиксов немного, и они фиксированы
+    head = cleaned[:_TME_PREFIX_MAX_LEN].lower()
+    for prefix in _TME_POST_PREFIXES:
+        if head.startswith(prefix):
+            cleaned = cleaned[len(prefix):]
+            break
 
     cleaned = cleaned.lstrip("@")
 
-    # Разделяем по "/"
-    parts = cleaned.split("/")
-
     # Для прямой ссылки нужно ровно 2 части: канал и ID
-    if len(parts) != 2:
-        return None
-
-    channel_slug, post_id_str = parts
-
-    # Проверяем что канал не пуст
-    if not channel_slug:
+    channel_slug, sep, post_id_str = cleaned.partition("/")
+    if not sep or not channel_slug or "/" in post_id_str:
         return None
 
     # Проверяем что ID — число
@@ -181,21 +254,24 @@ def _parse_counter(raw: str) -> int:
     Returns:
         Целое число
     """
-    text = raw.replace(" ", "").upper()
-    match = re.match(r"([0-9]+(?:[\.,][0-9]+)?)([KM]?)", text)
+    text = raw.replace(" ", "")
+    # Быстрый путь: обычный счетчик без суффикса ("1 234")
+    if text.isascii() and text.isdigit():
+        return int(text)
+
+    text = text.upper()
+    match = _COUNTER_RE.match(text)
     if not match:
-        digits = re.sub(r"\D", "", text)
+        digits = _NON_DIGIT_RE.sub("", text)
         return int(digits) if digits.isdigit() else 0
 
     number_part, suffix = match.groups()
-    number = float(number_part.replace(",", "."))
-
-    if suffix == "K":
-        number *= 1_000
-    elif suffix == "M":
-        number *= 1_000_000
+    multiplier = _COUNTER_MULTIPLIERS[suffix]
+    # Целое с суффиксом ("5K") считаем без float
+    if "." not in number_part and "," not in number_part:
+        return int(number_part) * multiplier
 
-    return int(number)
+    return int(float(number_part.replace(",", ".")) * multiplier)
 
 
 def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
@@ -220,132 +296,6 @@ def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
         return None
 
 
-def _extract_photo_url(message: Tag) -> Optional[str]:
-    """Извлекает прямую ссылку на фото из поста."""
-    # 1. Проверяем элементы с потенциальными фото
-    selectors = [
-        ".tgme_widget_message_photo_wrap",
-        ".tgme_widget_message_photo",
-        ".tgme_widget_message_video_thumb",
-        ".tgme_widget_message_video_player"
-    ]
-    
-    for selector in selectors:
-        for el in message.select(selector):
-            style = el.get("style", "")
-            if style:
-                match = re.search(r"url\(['\"]?(.*?)['\"]?\)", style)
-                if match:
-                    url = match.group(1)
-                    if url.startswith("//"):
-                        url = "https:" + url
-                    return url
-            
-            # Если это тег img
-            if el.name == "img" and el.has_attr("src"):
-                url = el["src"]
-                if url.startswith("//"):
-                    url = "https:" + url
-                return url
-
-    # 2. Поиск любого background-image в элементах со стилем
-    for el in message.find_all(style=True):
-        style = el["style"]
-        if "background-image" in style:
-            match = re.search(r"url\(['\"]?(.*?)['\"]?\)", style)
-            if match:
-                url = match.group(1)
-                if url.startswith("//"):
-                    url = "https:" + url
-                return url
-                
-    # 3. Поиск тегов img (кроме аватаров)
-    for img in message.find_all("img"):
-        classes = img.get("class", [])
-        if isinstance(classes, str):
-            classes = [classes]
-        if "tgme_widget_message_user_photo" not in classes:
-            url = img.get("src")
-            if url:
-                if url.startswith("//"):
-                    url = "https:" + url
-                return url
-
-    return None
-
-
-def _extract_video_url(message: Tag) -> Optional[str]:
-    """Извлекает прямую ссылку на видео из поста."""
-    # 1. Проверяем элементы с потенциальными видео
-    selectors = [
-        ".tgme_widget_message_video",
-        ".tgme_widget_message_video_player",
-        ".tgme_widget_message_video_wrap"
-    ]
-
-    for selector in selectors:
-        for el in message.select(selector):
-            # Проверяем background-image в стиле
-            style = el.get("style", "")
-            if style and "background-image" in style:
-                match = re.search(r"url\(['\"]?(.*?)['\"]?\)", style)
-                if match:
-                    url = match.group(1)
-                    if url.startswith("//"):
-                        url = "https:" + url
-                    return url
-
-            # Ищем <video> теги внутри элемента
-            video_tag = el.find("video")
-            if video_tag:
-                # Проверяем src атрибут тега video
-                if video_tag.has_attr("src"):
-                    url = video_tag["src"]
-                    if url.startswith("//"):
-                        url = "https:" + url
-                    return url
-
-                # Проверяем <source> элементы внутри <video>
-                source = video_tag.find("source")
-                if source and source.has_attr("src"):
-                    url = source["src"]
-                    if url.startswith("//"):
-                        url = "https:" + url
-                    return url
-
-    # 2. Поиск <video> тегов в сообщении
-    for video in message.find_all("video"):
-        if video.has_attr("src"):
-            url = video["src"]
-            if url.startswith("//"):
-                url = "https:" + url
-            return url
-
-        # Проверяем <source> элементы
-        source = video.find("source")
-        if source and source.has_attr("src"):
-            url = source["src"]
-            if url.startswith("//"):
-                url = "https:" + url
-            return url
-
-    # 3. Поиск data-src атрибутов (для ленивой загрузки)
-    for el in message.find_all(attrs={"data-src": True}):
-        url = el.get("data-src")
-        if url:
-            if url.startswith("//"):
-                url = "https:" + url
-            return url
-
-    return None
-
-
-def _extract_text(message) -> str:
-    """Извлекает текст сообщения из HTML."""
-    block = message.select_one(".tgme_widget_message_text")
-    return block.get_text("\n", strip=True) if block else ""
-
-
 def _extract_post_link(message) -> Optional[str]:
     """Извлекает ссылку на пост из HTML."""
     link = message.select_one("a.tgme_widget_message_date")
@@ -354,67 +304,149 @@ def _extract_post_link(message) -> Optional[str]:
     return None
 
 
-def _extract_views(message) -> int:
-    """Извлекает количество просмотров из HTML."""
-    views_tag = message.select_one(".tgme_widget_message_views")
-    return _parse_counter(views_tag.get_text(strip=True)) if views_tag else 0
+def _absolute_url(url: str) -> str:
+    """Дополняет протокол у ссылок вида //cdn..."""
+    return "https:" + url if url.startswith("//") else url
 
 
-def _extract_forwards(message) -> int:
-    """Извлекает количество пересылок из HTML."""
-    forwards_tag = message.select_one(".tgme_widget_message_forwards")
-    return _parse_counter(forwards_tag.get_text(strip=True)) if forwards_tag else 0
+def _video_tag_url(video: Tag) -> Optional[str]:
+    """Ссылка из тега <video>: атрибут src или первый вложенный <source>."""
+    if video.has_attr("src"):
+        return video["src"]
+    source = video.find("source")
+    if source and source.has_attr("src"):
+        return source["src"]
+    return None
 
 
-def _detect_media_type(message) -> dict:
+def _extract_media(
+    message: Tag, has_text: bool
+) -> tuple[dict, Optional[str], Optional[str]]:
     """
-    Определяет детальный тип медиа в сообщении.
+    Определяет тип медиа и ссылки на фото и видео за один обход HTML сообщения.
+
+    Кандидаты собираются по приоритетам (сначала классы Telegram в порядке важности,
+    затем общие fallback-правила), поэтому результат тот же, что при отдельных
+    проходах по каждому селектору.
 
     Returns:
-        dict: {
+        Кортеж (media_type, photo_url, video_url), где media_type: {
             'type': 'text'|'photo'|'video'|'gallery'|'poll'|'voice'|'document',
             'has_text': bool,
             'media_count': int
         }
     """
-    has_text = bool(message.select_one(".tgme_widget_message_text"))
-
-    # Опрос
-    if message.select_one(".tgme_widget_message_poll"):
-        return {"type": "poll", "has_text": has_text, "media_count": 1}
-
-    # Голосовое
-    if message.select_one(".tgme_widget_message_voice"):
-        return {"type": "voice", "has_text": has_text, "media_count": 1}
-
-    # Документ
-    if message.select_one(".tgme_widget_message_document"):
-        return {"type": "document", "has_text": has_text, "media_count": 1}
+    photo_hits: list[Optional[str]] = [None] * len(_PHOTO_CLASSES)
+    video_hits: list[Optional[str]] = [None] * len(_VIDEO_CLASSES)
+    photo_background = photo_img = video_tag = video_data_src = None
+    found_types: set[str] = set()
+    photo_wraps = 0
+
+    for el in message.find_all(True):
+        classes = el.get("class") or ()
+        style = el.get("style") or ""
+        # Дешёвая проверка подстроки перед регулярным выражением
+        match = _URL_IN_STYLE_RE.search(style) if "url(" in style else None
+        style_url = match.group(1) if match else None
+
+        for cls in classes:
+            if cls in _MEDIA_TYPE_CLASSES:
+                found_types.add(_MEDIA_TYPE_CLASSES[cls])
+        if "tgme_widget_message_photo_wrap" in classes:
+            photo_wraps += 1
+
+        for rank, cls in enumerate(_PHOTO_CLASSES):
+            if photo_hits[rank] is None and cls in classes:
+                if style_url:
+                    photo_hits[rank] = style_url
+                elif el.name == "img" and el.has_attr("src"):
+                    photo_hits[rank] = el["src"]
+
+        for rank, cls in enumerate(_VIDEO_CLASSES):
+            if video_hits[rank] is None and cls in classes:
+                if style_url and "background-image" in style:
+                    video_hits[rank] = style_url
+                elif (inner := el.find("video")) is not None:
+                    video_hits[rank] = _video_tag_url(inner)
+
+        if photo_background is None and style_url and "background-image" in style:
+            photo_background = style_url
+        if el.name == "img":
+            if photo_img is None and "tgme_widget_message_user_photo" not in classes:
+                photo_img = el.get("src") or None
+        elif el.name == "video" and video_tag is None:
+            video_tag = _video_tag_url(el)
+        if video_data_src is None:
+            video_data_src = el.get("data-src") or None
+
+    photo_url = next(
+        (url for url in (*photo_hits, photo_background, photo_img) if url), None
+    )
+    video_url = next(
+        (url for url in (*video_hits, video_tag, video_data_src) if url), None
+    )
+
+    for media in ("poll", "voice", "document", "video"):
+        if media in found_types:
+            media_type = {"type": media, "has_text": has_text, "media_count": 1}
+            break
+    else:
+        if photo_wraps > 1:
+            media_type = {
+                "type": "gallery", "has_text": has_text, "media_count": photo_wraps
+            }
+        elif "photo" in found_types:
+            media_type = {"type": "photo", "has_text": has_text, "media_count": 1}
+        else:
+            media_type = {"type": "text", "has_text": has_text, "media_count": 0}
 
-    # Видео
-    if message.select_one(".tgme_widget_message_video"):
-        return {"type": "video", "has_text": has_text, "media_count": 1}
+    return (
+        media_type,
+        _absolute_url(photo_url) if photo_url else None,
+        _absolute_url(video_url) if video_url else None,
+    )
 
-    # Фото/галерея
-    photos = message.select(".tgme_widget_message_photo_wrap")
-    if photos and len(photos) > 1:
-        return {"type": "gallery", "has_text": has_text, "media_count": len(photos)}
-    elif message.select_one(".tgme_widget_message_photo"):
-        return {"type": "photo", "has_text": has_text, "media_count": 1}
 
-    # Только текст
-    return {"type": "text", "has_text": has_text, "media_count": 0}
+def _extract_message(message: Tag, slug: str, post_link: str) -> dict:
+    """
+    Извлекает поля поста из HTML сообщения.
 
+    Общие узлы ищутся один раз, а has_media выводится из уже определённого типа медиа.
+    """
+    text_block = message.select_one(".tgme_widget_message_text")
+    views_tag = message.select_one(".tgme_widget_message_views")
+    forwards_tag = message.select_one(".tgme_widget_message_forwards")
+    media_type, photo_url, video_url = _extract_media(message, text_block is not None)
+
+    posted_at = None
+    time_tag = message.find("time")
+    if time_tag is not None and time_tag.has_attr("datetime"):
+        datetime_attr = time_tag.get("datetime")
+        posted_at = _parse_datetime(
+            datetime_attr if isinstance(datetime_attr, str) else None
+        )
 
-def _detect_media(message) -> bool:
-    """Определяет наличие медиа в сообщении (фото, видео, документ, голос и т.д.)."""
-    result = _detect_media_type(message)
-    return result["type"] != "text"
+    return {
+        "channel_slug": slug,
+        "channel_link": f"https://t.me/{slug}",
+        "post_link": post_link,
+        "text": text_block.get_text("\n", strip=True) if text_block else "",
+        "posted_at": posted_at,
+        "views": _parse_counter(views_tag.get_text(strip=True)) if views_tag else 0,
+        "forwards": (
+            _parse_counter(forwards_tag.get_text(strip=True)) if forwards_tag else 0
+        ),
+        "has_media": media_type["type"] != "text",
+        "is_forwarded": _is_forwarded(message),
+        "media_type": media_type,
+        "photo_url": photo_url,
+        "video_url": video_url,
+    }
 
 
 def _extract_message_id(message) -> Optional[int]:
     """Извлекает ID сообщения из HTML для пагинации."""
-    post_attr = message.get("data-post") if isinstance(message, Tag) else None
+    post_attr = message.get("data-post")
     if not post_attr:
         return None
 
@@ -426,15 +458,8 @@ def _extract_message_id(message) -> Optional[int]:
 
 def _is_forwarded(message) -> bool:
     """Проверяет является ли сообщение пересланным (игнорируются)."""
-    if not isinstance(message, Tag):
-        return False
-    # Присутствует блок forwarded-from
-    if message.select_one(".tgme_widget_message_forwarded_from"):
-        return True
-    # Иногда forward-плашка имеет другие классы
-    if message.select_one(".tgme_widget_message_forwarded_post_author"):
-        return True
-    return False
+    # Блок forwarded-from; иногда forward-плашка имеет другие классы
+    return message.select_one(_FORWARDED_SELECTOR) is not None
 
 
 class TelegramWebScraper:
@@ -446,7 +471,7 @@ class TelegramWebScraper:
 
     Пример:
         scraper = TelegramWebScraper()
-        posts = scraper.fetch_posts("@mychannel", pages=3)
+        posts = await scraper.fetch_posts("@mychannel", pages=3)
         for post in posts:
             print(f"Текст: {post['text']}")
             print(f"Просмотры: {post['views']}")
@@ -454,22 +479,67 @@ class TelegramWebScraper:
 
     BASE_URL = "https://t.me/s"
 
-    def __init__(self, session: Optional[requests.Session] = None):
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
         """
         Инициализирует парсер.
 
         Args:
-            session: Опциональная requests.Session для переиспользования соединения
+            session: Опциональная aiohttp.ClientSession; по умолчанию создаётся
+                своя при первом запросе (keep-alive соединения с t.me)
         """
-        self.session = session or requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
-                "Accept-Language": "en-US,en;q=0.9",
-            }
-        )
+        self.session = session
+        self._owns_session = session is None
+
+    async def close(self) -> None:
+        """Закрывает собственную HTTP-сессию парсера"""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
 
-    def fetch_posts(self, channel: str, pages: int = 1) -> List[dict]:
+    async def _get(self, url: str) -> tuple[int, bool, str]:
+        """
+        GET запрос к t.me.
+
+        Returns:
+            Кортеж (HTTP статус, был ли редирект, HTML страницы)
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=16, keepalive_timeout=60, ttl_dns_cache=300
+                ),
+                headers=self.HEADERS,
+                timeout=_REQUEST_TIMEOUT,
+            )
+            self._owns_session = True
+
+        for attempt in range(_MAX_RETRIES + 1):
+            last_try = attempt == _MAX_RETRIES
+            try:
+                async with self.session.get(url, allow_redirects=True) as response:
+                    if last_try or response.status not in _RETRY_STATUSES:
+                        return (
+                            response.status,
+                            bool(response.history),
+                            await response.text(),
+                        )
+            except asyncio.TimeoutError as exc:
+                # Таймаут не повторяем: пользователь и так ждал полный интервал
+                raise TelegramWebError(f"Ошибка запроса: {exc}") from exc
+            except aiohttp.ClientConnectionError as exc:
+                if last_try:
+                    raise TelegramWebError(f"Ошибка запроса: {exc}") from exc
+            except aiohttp.ClientError as exc:
+                raise TelegramWebError(f"Ошибка запроса: {exc}") from exc
+
+            await asyncio.sleep(_RETRY_BACKOFF * 2**attempt)
+
+    async def fetch_posts(self, channel: str, pages: int = 1) -> List[dict]:
         """
         Спарсить посты из канала с пагинацией.
 
@@ -507,7 +577,7 @@ class TelegramWebScraper:
         next_before: Optional[int] = None
 
         for _ in range(pages):
-            page_posts, next_before = self._fetch_page(slug, next_before)
+            page_posts, next_before = await self._fetch_page(slug, next_before)
             if not page_posts:
                 break
             all_posts.extend(page_posts)
@@ -529,7 +599,7 @@ class TelegramWebScraper:
 
         return ordered
 
-    def _fetch_page(
+    async def _fetch_page(
         self, slug: str, before: Optional[int]
     ) -> tuple[list[dict], Optional[int]]:
         """
@@ -546,13 +616,10 @@ class TelegramWebScraper:
         if before:
             url = f"{url}?before={before}"
 
-        try:
-            response = self.session.get(url, timeout=15, allow_redirects=True)
-        except requests.RequestException as exc:
-            raise TelegramWebError(f"Ошибка запроса: {exc}") from exc
+        status, redirected, html = await self._get(url)
 
         # Проверка редиректа (контент недоступен)
-        if response.history:
+        if redirected:
             raise TelegramWebError(
                 f"Контент недоступен\n\n"
                 f"Возможные причины:\n"
@@ -560,16 +627,22 @@ class TelegramWebScraper:
                 f"• Администратор канала запретил копирование постов\n\n"
             )
 
-        if response.status_code == 404:
+        if status == 404:
             raise TelegramWebError("Канал не найден или приватный")
-        if response.status_code in (403, 429):
+        if status in (403, 429):
             raise TelegramWebError(
-                f"Доступ к t.me запрещен (HTTP {response.status_code}), требуется прокси/капча"
+                f"Доступ к t.me запрещен (HTTP {status}), требуется прокси/капча"
             )
-        if response.status_code != 200:
-            raise TelegramWebError(f"t.me вернул статус {response.status_code}")
+        if status != 200:
+            raise TelegramWebError(f"t.me вернул статус {status}")
+
+        # Разбор HTML нагружает CPU — выполняем в потоке, не блокируя event loop
+        return await asyncio.to_thread(self._parse_page, slug, html)
 
-        soup = BeautifulSoup(response.text, "html.parser")
+    @staticmethod
+    def _parse_page(slug: str, html: str) -> tuple[list[dict], Optional[int]]:
+        """Разбирает HTML страницы канала: (посты, ID для следующей страницы или None)"""
+        soup = _make_soup(html)
         if soup.select_one(".tgme_page_error"):
             raise TelegramWebError(
                 "Telegram вернул страницу ошибки (возможно нужна авторизация или канал скрыт)"
@@ -580,9 +653,9 @@ class TelegramWebScraper:
             return [], None
 
         posts: list[dict] = []
-        msg_ids: list[int] = []
+        min_id: Optional[int] = None
 
-        for message in reversed(messages):  # новейшие первыми внутри страницы
+        for message in messages:
             post_link = _extract_post_link(message)
             if not post_link:
                 continue
@@ -592,43 +665,19 @@ class TelegramWebScraper:
             #     continue
 
             msg_id = _extract_message_id(message)
-            if msg_id:
-                msg_ids.append(msg_id)
-
-            posted_at = None
-            time_tag = message.find("time")
-            if isinstance(time_tag, Tag) and time_tag.has_attr("datetime"):
-                datetime_attr = time_tag.get("datetime")
-                posted_at = _parse_datetime(
-                    datetime_attr if isinstance(datetime_attr, str) else None
-                )
-
-            posts.append(
-                {
-                    "channel_slug": slug,
-                    "channel_link": f"https://t.me/{slug}",
-                    "post_link": post_link,
-                    "text": _extract_text(message),
-                    "posted_at": posted_at,
-                    "views": _extract_views(message),
-                    "forwards": _extract_forwards(message),
-                    "has_media": _detect_media(message),
-                    "is_forwarded": _is_forwarded(message),
-                    "media_type": _detect_media_type(message),
-                    "photo_url": _extract_photo_url(message),
-                    "video_url": _extract_video_url(message),
-                    "message_id": msg_id,
-                }
-            )
+            if msg_id and (min_id is None or msg_id < min_id):
+                min_id = msg_id
 
-        next_before = None
-        if msg_ids:
-            min_id = min(msg_ids)
-            next_before = min_id if min_id > 1 else None
+            post = _extract_message(message, slug, post_link)
+            post["message_id"] = msg_id
+            posts.append(post)
+
+        posts.reverse()  # новейшие первыми внутри страницы
+        next_before = min_id if min_id and min_id > 1 else None
 
         return posts, next_before
 
-    def fetch_single_post(self, channel: str, post_id: int) -> dict:
+    async def fetch_single_post(self, channel: str, post_id: int) -> dict:
         """
         Загружает один конкретный пост по его ID из публичного канала.
 
@@ -662,13 +711,10 @@ class TelegramWebScraper:
         # URL для прямого доступа к посту: https://t.me/s/channelname/postid
         url = f"{self.BASE_URL}/{slug}/{post_id}"
 
-        try:
-            response = self.session.get(url, timeout=15, allow_redirects=True)
-        except requests.RequestException as exc:
-            raise TelegramWebError(f"Ошибка запроса: {exc}") from exc
+        status, redirected, html = await self._get(url)
 
         # Проверка редиректа (контент недоступен)
-        if response.history:
+        if redirected:
             raise TelegramWebError(
                 "Пост недоступен\n\n"
                 "Возможные причины:\n"
@@ -677,18 +723,21 @@ class TelegramWebScraper:
             )
 
         # Обработка HTTP ошибок
-        if response.status_code == 404:
+        if status == 404:
             raise TelegramWebError(
                 "Пост не найден. Возможно, он был удален или канал приватный."
             )
-        if response.status_code in (403, 429):
-            raise TelegramWebError(
-                f"Доступ к t.me запрещен (HTTP {response.status_code})"
-            )
-        if response.status_code != 200:
-            raise TelegramWebError(f"t.me вернул статус {response.status_code}")
+        if status in (403, 429):
+            raise TelegramWebError(f"Доступ к t.me запрещен (HTTP {status})")
+        if status != 200:
+            raise TelegramWebError(f"t.me вернул статус {status}")
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        return await asyncio.to_thread(self._parse_single_post, slug, post_id, html)
+
+    @staticmethod
+    def _parse_single_post(slug: str, post_id: int, html: str) -> dict:
+        """Разбирает HTML страницы поста и извлекает пост с нужным ID"""
+        soup = _make_soup(html)
 
         # Проверяем на страницу ошибки
         if soup.select_one(".tgme_page_error"):
@@ -697,8 +746,10 @@ class TelegramWebScraper:
             )
 
         # Ищем сообщение с конкретным ID на странице
-        # Используем data-post атрибут для точного поиска нужного поста
-        message = soup.select_one(f'.tgme_widget_message[data-post="{slug}/{post_id}"]')
+        # Используем data-post атрибут для точного поиска нужного поста (без CSS-селектора)
+        message = soup.find(
+            class_="tgme_widget_message", attrs={"data-post": f"{slug}/{post_id}"}
+        )
         if not message:
             raise TelegramWebError(
                 "Пост не найден на странице. Возможно, он был удален или ID неверный."
@@ -709,26 +760,35 @@ class TelegramWebScraper:
         if not post_link:
             raise TelegramWebError("Не удалось извлечь ссылку на пост")
 
-        # Извлекаем datetime
-        posted_at = None
-        time_tag = message.find("time")
-        if isinstance(time_tag, Tag) and time_tag.has_attr("datetime"):
-            datetime_attr = time_tag.get("datetime")
-            posted_at = _parse_datetime(
-                datetime_attr if isinstance(datetime_attr, str) else None
-            )
+        return _extract_message(message, slug, post_link)
 
-        return {
-            "channel_slug": slug,
-            "channel_link": f"https://t.me/{slug}",
-            "post_link": post_link,
-            "text": _extract_text(message),
-            "posted_at": posted_at,
-            "views": _extract_views(message),
-            "forwards": _extract_forwards(message),
-            "has_media": _detect_media(message),
-            "is_forwarded": _is_forwarded(message),
-            "media_type": _detect_media_type(message),
-            "photo_url": _extract_photo_url(message),
-            "video_url": _extract_video_url(message),
-        }
+
+def fetch_posts_sync(channel: str, pages: int = 1) -> List[dict]:
+    """
+    Синхронная обёртка над TelegramWebScraper.fetch_posts для standalone-использования.
+
+    Запускает собственный event loop через asyncio.run, поэтому не вызывается
+    из корутин — там используйте await TelegramWebScraper().fetch_posts(...).
+    """
+
+    async def run() -> List[dict]:
+        scraper = TelegramWebScraper()
+        try:
+            return await scraper.fetch_posts(channel, pages=pages)
+        finally:
+            await scraper.close()
+
+    return asyncio.run(run())
+
+
+def fetch_single_post_sync(channel: str, post_id: int) -> dict:
+    """Синхронная обёртка над TelegramWebScraper.fetch_single_post (см. fetch_posts_sync)."""
+
+    async def run() -> dict:
+        scraper = TelegramWebScraper()
+        try:
+            return await scraper.fetch_single_post(channel, post_id)
+        finally:
+            await scraper.close()
+
+    return asyncio.run(run())
@@ -11,18 +11,22 @@ EMOJI_MAP = {
 }
 
 
+# Плоская таблица (тип, есть ли текст) -> эмодзи, строится один раз при импорте
+_EMOJI_BY_TYPE = {
+    (post_type, has_text): (
+        emoji if isinstance(emoji, str) else emoji["with_text" if has_text else "default"]
+    )
+    for post_type, emoji in EMOJI_MAP.items()
+    for has_text in (True, False)
+}
+
+
 def get_post_emoji(post: dict) -> str:
     """Определяет эмодзи для типа поста"""
     # Старый формат (has_media)
     if not (media_type := post.get("media_type")):
         return "🖼" if post.get("has_media") else "📄"
 
-    post_type = media_type.get("type", "text")
-    emoji_obj = EMOJI_MAP.get(post_type, "📝")
-
-    # Для типов с вариантами по has_text
-    if isinstance(emoji_obj, dict):
-        return emoji_obj.get(
-            "with_text" if media_type.get("has_text") else "default", "📝"
-        )
-    return emoji_obj if isinstance(emoji_obj, str) else "📝"
+    return _EMOJI_BY_TYPE.get(
+        (media_type.get("type", "text"), bool(media_type.get("has_text"))), "📝"
+    )
@@ -17,17 +17,16 @@ def truncate_text(text: str, max_length: int = 100) -> str:
 
 
 def _find_split_index(text: str, max_length: int) -> int:
-    window = text[: max_length + 1]
-    split_idx = max(window.rfind("\n"), window.rfind(" "), window.rfind("\t"))
+    # rfind с границей вместо копии окна text[:max_length + 1]
+    end = max_length + 1
+    split_idx = max(
+        text.rfind("\n", 0, end), text.rfind(" ", 0, end), text.rfind("\t", 0, end)
+    )
     return split_idx if split_idx > 0 else max_length
 
 
-def split_text_once(text: str, max_length: int) -> Tuple[str, str]:
-    """Делит текст на две части, первая не превышает max_length."""
-    if not text or not text.strip():
-        return "", ""
-
-    text = text.strip()
+def _split_stripped(text: str, max_length: int) -> Tuple[str, str]:
+    """split_text_once для текста без пробелов по краям (части сохраняют это свойство)."""
     if len(text) <= max_length:
         return text, ""
 
@@ -37,15 +36,23 @@ def split_text_once(text: str, max_length: int) -> Tuple[str, str]:
     return head, tail
 
 
+def split_text_once(text: str, max_length: int) -> Tuple[str, str]:
+    """Делит текст на две части, первая не превышает max_length."""
+    if not text or not (text := text.strip()):
+        return "", ""
+
+    return _split_stripped(text, max_length)
+
+
 def split_text(text: str, max_length: int) -> List[str]:
     """Делит текст на части длиной до max_length."""
-    if not text or not text.strip():
+    if not text or not (remainder := text.strip()):
         return []
 
+    # Текст обрезается один раз: хвосты после разреза уже без пробелов по краям
     parts = []
-    remainder = text.strip()
     while remainder:
-        head, remainder = split_text_once(remainder, max_length)
+        head, remainder = _split_stripped(remainder, max_length)
         if not head:
             break
         parts.append(head)